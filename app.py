@@ -5,8 +5,10 @@ from pathlib import Path
 # --- Import Custom Modules ---
 from utils import (
     load_config, save_config, load_snippets, save_snippets, 
-    load_json, save_json, generate_templates, DEFAULTS
+    load_json, save_json, generate_templates, list_data_files, DEFAULTS,
+    folder_compression, set_folder_compression, new_file_name
 )
+from json_io import available_compressions
 from tab_single import render_single_editor
 from tab_batch import render_batch_processor
 from tab_timeline import render_timeline_tab
@@ -32,8 +34,8 @@ if 'snippets' not in st.session_state:
 if 'loaded_file' not in st.session_state: 
     st.session_state.loaded_file = None
 
-if 'last_mtime' not in st.session_state: 
-    st.session_state.last_mtime = 0
+if 'file_version' not in st.session_state: 
+    st.session_state.file_version = None
 
 if 'edit_history_idx' not in st.session_state: 
     st.session_state.edit_history_idx = None
@@ -110,8 +112,7 @@ with st.sidebar:
     st.markdown("---")
     
     # --- File List & Creation ---
-    json_files = sorted(list(st.session_state.current_dir.glob("*.json")))
-    json_files = [f for f in json_files if f.name != ".editor_config.json" and f.name != ".editor_snippets.json"]
+    json_files = list_data_files(st.session_state.current_dir)
 
     if not json_files:
         if st.button("Generate Templates"):
@@ -121,8 +122,18 @@ with st.sidebar:
     with st.expander("Create New JSON"):
         new_filename = st.text_input("Filename", placeholder="my_prompt_vace")
         is_batch = st.checkbox("Is Batch File?")
+        as_jsonl = st.checkbox("JSON Lines (append-only)", disabled=not is_batch, help="One sequence per line: adding sequences appends instead of rewriting the file")
+        compression_opts = ["none"] + available_compressions()
+        current_compression = folder_compression(st.session_state.current_dir)
+        compression = st.selectbox(
+            "Compression (this folder)", compression_opts,
+            index=compression_opts.index(current_compression) if current_compression in compression_opts else 0,
+            help="New files in this folder are saved as .json.gz / .json.zst. History-heavy files shrink to a fraction of their size."
+        )
+        if compression != current_compression:
+            st.session_state.config["folder_compression"] = set_folder_compression(st.session_state.current_dir, compression)
         if st.button("Create"):
-            if not new_filename.endswith(".json"): new_filename += ".json"
+            new_filename = new_file_name(st.session_state.current_dir, new_filename, jsonl=is_batch and as_jsonl)
             path = st.session_state.current_dir / new_filename
             if is_batch:
                 data = {"batch_data": []}
@@ -145,6 +156,17 @@ with st.sidebar:
     st.markdown("---")
     show_monitor = st.checkbox("Show Comfy Monitor", value=True)
 
+    output_modes = ["pretty", "compact"]
+    json_output = st.radio(
+        "Save Format", output_modes,
+        index=output_modes.index(st.session_state.config.get("json_output", "pretty")),
+        horizontal=True,
+        help="Compact files are smaller and faster to save; pretty files are easier to read and diff."
+    )
+    if json_output != st.session_state.config.get("json_output", "pretty"):
+        st.session_state.config["json_output"] = json_output
+        save_config(st.session_state.current_dir, st.session_state.config['favorites'], {"json_output": json_output})
+
 # ==========================================
 # 4. MAIN APP LOGIC
 # ==========================================
@@ -153,9 +175,9 @@ if selected_file_name:
     
     # --- FILE LOADING & AUTO-SWITCH LOGIC ---
     if st.session_state.loaded_file != str(file_path):
-        data, mtime = load_json(file_path)
+        data, version = load_json(file_path)
         st.session_state.data_cache = data
-        st.session_state.last_mtime = mtime
+        st.session_state.file_version = version
         st.session_state.loaded_file = str(file_path)
         
         # Clear transient states
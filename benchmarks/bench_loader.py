@@ -0,0 +1,269 @@
+"""
+Throughput benchmark for the ComfyUI loader nodes in json_loader.py.
+
+Generates synthetic single, batch and VACE files (optionally carrying a large
+history_tree / prompt_history), then times every class in NODE_CLASS_MAPPINGS:
+  - cold: process caches dropped before every call (sidecar .idx files are kept)
+  - warm: repeated calls against the shared document cache
+
+Each file case runs in a fresh subprocess so peak RSS is measured per case.
+
+Usage:
+    python benchmarks/bench_loader.py                       # 10, 1k and 100k sequences
+    python benchmarks/bench_loader.py --sizes 10,1000 --output results.json
+    python benchmarks/bench_loader.py --compare old.json --output new.json
+    python benchmarks/bench_loader.py --watch               # with WATCH_FILES on (checks warm calls hit the cache)
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from queue import Empty
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CUSTOM_KEYS = ["seed", "current_prompt", "camera", "flf", "lora 1 high", "frame_to_skip", "negative", "vace schedule"]
+
+
+# ==========================================
+# 1. SYNTHETIC FILES
+# ==========================================
+
+def make_sequence(i, vace=False):
+    rnd = random.Random(i)
+    seq = {
+        "sequence_number": i,
+        "general_prompt": "cinematic, 4k, film grain, soft light",
+        "general_negative": "blurry, lowres, watermark",
+        "current_prompt": f"shot {i}: " + " ".join(rnd.choice(["a", "slow", "pan", "over", "the", "city", "at", "dusk"]) for _ in range(40)),
+        "negative": "",
+        "seed": rnd.randint(0, 999999999999),
+        "camera": rnd.choice(["static", "pan left", "zoom in"]),
+        "flf": 0.0,
+        "lora 1 high": "<lora:detail_high>", "lora 1 low": "<lora:detail_low>",
+        "lora 2 high": "", "lora 2 low": "",
+        "lora 3 high": "", "lora 3 low": "",
+        "reference image path": f"/mnt/user/refs/{i:05d}.png",
+        "flf image path": "",
+        "video file path": f"/mnt/user/video/{i:05d}.mp4",
+    }
+    if vace:
+        seq.update({
+            "frame_to_skip": 81, "input_a_frames": 16, "input_b_frames": 16,
+            "reference switch": 1, "vace schedule": 1, "reference path": f"/mnt/user/refs/{i:05d}",
+        })
+    return seq
+
+
+def make_history(payload_fn, snapshots):
+    nodes, parent = {}, None
+    for n in range(snapshots):
+        node_id = f"{n:08x}"
+        nodes[node_id] = {"id": node_id, "parent": parent, "timestamp": 1700000000.0 + n, "data": payload_fn(), "note": f"Snapshot {n}"}
+        parent = node_id
+    return {"nodes": nodes, "branches": {"main": parent}, "head_id": parent}
+
+
+def write_case(folder, kind, sequences, history):
+    vace = kind == "vace"
+    if kind == "single":
+        data = make_sequence(1)
+        history_payload = lambda: dict(data)
+    else:
+        data = {"batch_data": [make_sequence(i, vace) for i in range(1, sequences + 1)]}
+        # Snapshots carry a bounded slice so the 100k case stays writable on a laptop.
+        history_payload = lambda: {"batch_data": data["batch_data"][:1000]}
+
+    if history:
+        data["history_tree"] = make_history(history_payload, history)
+        data["prompt_history"] = [dict(make_sequence(i), note=f"Entry {i}") for i in range(history * 5)]
+
+    path = os.path.join(folder, f"{kind}_{sequences}_{'hist' if history else 'nohist'}.json")
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=4)
+    return path
+
+
+# ==========================================
+# 2. NODE CALLS
+# ==========================================
+
+def build_kwargs(cls, json_path, sequence_number, sequences):
+    spec = cls.INPUT_TYPES()
+    kwargs = {}
+    for name, (kind, *opts) in spec.get("required", {}).items():
+        if name == "json_path":
+            kwargs[name] = json_path
+        elif name == "sequence_number":
+            kwargs[name] = (sequence_number - 1) % sequences + 1
+        elif name == "start":
+            kwargs[name] = 1
+        elif name == "count":
+            kwargs[name] = min(sequences, 100)
+        elif isinstance(kind, list):
+            kwargs[name] = kind[0]
+        else:
+            kwargs[name] = opts[0].get("default") if opts else None
+    for name in spec.get("optional", {}):
+        if name.startswith("key_"):
+            kwargs[name] = CUSTOM_KEYS[(int(name[4:]) - 1) % len(CUSTOM_KEYS)]
+    return kwargs
+
+
+def is_stateful(cls):
+    """Nodes whose IS_CHANGED is NaN (e.g. JSONBatchIterator) move state on every call, so they are not timed."""
+    try:
+        value = cls.IS_CHANGED()  # only the **kwargs signature of the stateful nodes accepts no inputs
+    except (AttributeError, TypeError):
+        return False
+    return isinstance(value, float) and value != value
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def summarize(samples):
+    total = sum(samples)
+    return {
+        "calls": len(samples),
+        "calls_per_sec": len(samples) / total if total else float("inf"),
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "mean_ms": statistics.fmean(samples) * 1000,
+    }
+
+
+def run_case(json_path, sequences, cold_iters, warm_iters, watch, queue):
+    sys.path.insert(0, REPO_ROOT)
+    import json_loader
+    json_loader.WATCH_FILES = watch
+
+    results = {}
+    for name, cls in json_loader.NODE_CLASS_MAPPINGS.items():
+        if is_stateful(cls):
+            continue
+        node = cls()
+        func = getattr(node, cls.FUNCTION)
+
+        try:
+            cold = []
+            for i in range(cold_iters):
+                kwargs = build_kwargs(cls, json_path, i + 1, sequences)
+                json_loader._DOC_CACHE.clear()
+                json_loader._INDEX_CACHE.clear()
+                t0 = time.perf_counter()
+                func(**kwargs)
+                cold.append(time.perf_counter() - t0)
+
+            warm = []
+            parses = json_loader.STATS.parses
+            for i in range(warm_iters):
+                kwargs = build_kwargs(cls, json_path, i + 1, sequences)
+                t0 = time.perf_counter()
+                func(**kwargs)
+                warm.append(time.perf_counter() - t0)
+        except Exception as e:
+            print(f"{name}: skipped ({e})")
+            continue
+
+        # an unchanged file must stay cached, with or without the watcher
+        results[name] = {"cold": summarize(cold), "warm": summarize(warm), "warm_parses": json_loader.STATS.parses - parses}
+
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+    queue.put({"nodes": results, "peak_rss_mb": peak_rss_mb})
+
+
+# ==========================================
+# 3. DRIVER
+# ==========================================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,1000,100000", help="Comma separated sequence counts for batch/VACE files")
+    parser.add_argument("--history", type=int, default=20, help="Snapshots in the 'hist' variants (0 skips them)")
+    parser.add_argument("--cold-iters", type=int, default=5)
+    parser.add_argument("--warm-iters", type=int, default=200)
+    parser.add_argument("--output", help="Write machine readable results to this JSON file")
+    parser.add_argument("--compare", help="Previous --output file to compare warm/cold p50 against")
+    parser.add_argument("--workdir", help="Where to generate files (default: a temp dir)")
+    parser.add_argument("--watch", action="store_true", help="Run with json_loader.WATCH_FILES on")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    history_variants = [0, args.history] if args.history else [0]
+    folder = args.workdir or tempfile.mkdtemp(prefix="json_loader_bench_")
+    os.makedirs(folder, exist_ok=True)
+
+    cases = [("single", 1, h) for h in history_variants]
+    cases += [(kind, n, h) for kind in ("batch", "vace") for n in sizes for h in history_variants]
+
+    ctx = multiprocessing.get_context("spawn")
+    report = {"python": sys.version.split()[0], "created": time.time(), "cases": {}}
+
+    for kind, sequences, history in cases:
+        path = write_case(folder, kind, sequences, history)
+        case_id = os.path.splitext(os.path.basename(path))[0]
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        print(f"\n=== {case_id} ({size_mb:.1f} MB) ===")
+
+        queue = ctx.Queue()
+        proc = ctx.Process(target=run_case, args=(path, sequences, args.cold_iters, args.warm_iters, args.watch, queue))
+        proc.start()
+        result = None
+        while result is None:
+            try:
+                result = queue.get(timeout=5)
+            except Empty:  # keep waiting while the child is alive
+                if not proc.is_alive():
+                    break
+        proc.join()
+        if result is None:
+            print(f"case failed (child exit code {proc.exitcode})")
+            continue
+
+        result["file_mb"] = size_mb
+        report["cases"][case_id] = result
+        print(f"{'node':<28}{'cold p50 ms':>12}{'cold p99 ms':>12}{'warm p50 ms':>12}{'warm p99 ms':>12}{'warm calls/s':>14}")
+        for name, r in result["nodes"].items():
+            c, w = r["cold"], r["warm"]
+            print(f"{name:<28}{c['p50_ms']:>12.3f}{c['p99_ms']:>12.3f}{w['p50_ms']:>12.3f}{w['p99_ms']:>12.3f}{w['calls_per_sec']:>14.0f}")
+            if r["warm_parses"]:
+                print(f"  WARNING: {name} re-parsed the unchanged file {r['warm_parses']}x during warm calls")
+        print(f"peak RSS: {result['peak_rss_mb']:.1f} MB")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=4)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        print("\n=== Comparison (p50 ratio new/old, < 1.0 is faster) ===")
+        for case_id, result in report["cases"].items():
+            old_case = baseline.get("cases", {}).get(case_id)
+            if not old_case:
+                continue
+            for name, r in result["nodes"].items():
+                old = old_case["nodes"].get(name)
+                if not old:
+                    continue
+                ratios = [
+                    r[phase]["p50_ms"] / old[phase]["p50_ms"] if old[phase]["p50_ms"] else float("nan")
+                    for phase in ("cold", "warm")
+                ]
+                print(f"{case_id:<28}{name:<28} cold x{ratios[0]:.2f}  warm x{ratios[1]:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Serializer benchmark for json_io.dumps / json_io.loads.
+
+Builds representative editor files (a single file and batches, with and without a
+history_tree / prompt_history) and times every available backend in pretty and compact
+mode against the previous behaviour (stdlib json, indent=4).
+
+Usage:
+    python benchmarks/bench_serializer.py
+    python benchmarks/bench_serializer.py --sizes 100,5000 --history 40 --iters 10
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import json_io
+from bench_loader import make_sequence, make_history
+
+
+def build_case(kind, sequences, history):
+    if kind == "single":
+        data = make_sequence(1)
+        payload = lambda: dict(data)
+    else:
+        data = {"batch_data": [make_sequence(i) for i in range(1, sequences + 1)]}
+        payload = lambda: {"batch_data": data["batch_data"][:1000]}
+    if history:
+        data["history_tree"] = make_history(payload, history)
+        data["prompt_history"] = [dict(make_sequence(i), note=f"Entry {i}") for i in range(history * 5)]
+    return data
+
+
+def timed(fn, iters):
+    samples = []
+    for _ in range(iters):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+def engines():
+    """(label, dumps, loads) for the baseline plus every json_io backend/mode available here."""
+    yield "json indent=4 (old)", lambda d: json.dumps(d, indent=4).encode("utf-8"), json.loads
+    backends = ["json"] + (["orjson"] if json_io.orjson is not None else [])
+    for name in backends:
+        for pretty in (True, False):
+            def dumps(d, name=name, pretty=pretty):
+                json_io.SERIALIZER = name
+                return json_io.dumps(d, pretty)
+
+            def loads(raw, name=name):
+                json_io.SERIALIZER = name
+                return json_io.loads(raw)
+            yield f"{name} {'pretty' if pretty else 'compact'}", dumps, loads
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,2000", help="Comma separated sequence counts for batch files")
+    parser.add_argument("--history", type=int, default=20, help="Snapshots in the 'hist' variants (0 skips them)")
+    parser.add_argument("--iters", type=int, default=5)
+    args = parser.parse_args()
+
+    if json_io.orjson is None:
+        print("orjson is not installed: only the stdlib backend is measured (pip install orjson)")
+
+    history_variants = [0, args.history] if args.history else [0]
+    cases = [("single", 1, h) for h in history_variants]
+    cases += [("batch", int(n), h) for n in args.sizes.split(",") if n for h in history_variants]
+
+    for kind, sequences, history in cases:
+        data = build_case(kind, sequences, history)
+        print(f"\n=== {kind}_{sequences}_{'hist' if history else 'nohist'} ===")
+        print(f"{'engine':<22}{'size MB':>10}{'dump ms':>10}{'load ms':>10}{'dump x':>9}{'load x':>9}")
+        baseline = None
+        for label, dumps, loads in engines():
+            raw = dumps(data)
+            dump_s = timed(lambda: dumps(data), args.iters)
+            load_s = timed(lambda: loads(raw), args.iters)
+            if baseline is None:
+                baseline = (dump_s, load_s)
+            print(f"{label:<22}{len(raw) / 1e6:>10.2f}{dump_s * 1000:>10.1f}{load_s * 1000:>10.1f}"
+                  f"{baseline[0] / dump_s:>9.1f}{baseline[1] / load_s:>9.1f}")
+    json_io.SERIALIZER = "auto"
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,52 @@
+import bisect
+import copy
+import hashlib
+import os
 import time
 import uuid
+from json_io import atomic_write, canonical_dumps, compress_for, compression_for, decompress, dumps, loads
+
+# Keys kept in the <file>.history.json sidecar instead of the data file itself
+HISTORY_KEYS = ("history_tree", "prompt_history")
+# Stripped by the earlier sidecar naming (see _legacy_sidecar_path)
+DATA_SUFFIXES = (".json.gz", ".json.zst", ".jsonl", ".json")
+
+# sidecar path -> sha1 of the bytes last read/written, so unchanged history is not rewritten
+_SIDECAR_DIGESTS = {}
 
 class HistoryTree:
+    """
+    Snapshot payloads are stored content-addressed: every sequence in batch_data and every
+    other dict/list value is a blob in self.blobs keyed by the hash of its canonical JSON, so
+    a snapshot only adds what changed since the ones before it. A node keeps the hash of its
+    payload's root blob in "ref" (see _put_payload); read payloads with get_data(node_id).
+
+    Parent -> children, tip -> branch names and a timestamp-ordered list of nodes are kept
+    as indexes (rebuilt on load, not stored), so commits, branch lookups and deletes do not
+    scan the whole tree.
+    """
     def __init__(self, raw_data):
-        self.nodes = raw_data.get("nodes", {})
+        self.nodes = dict(raw_data.get("nodes", {}))
+        self.blobs = dict(raw_data.get("blobs", {}))
         self.branches = raw_data.get("branches", {"main": None}) 
         self.head_id = raw_data.get("head_id", None)
         
         if "prompt_history" in raw_data and isinstance(raw_data["prompt_history"], list) and not self.nodes:
             self._migrate_legacy(raw_data["prompt_history"])
+        for node_id, node in self.nodes.items():
+            if "data" in node:
+                self.nodes[node_id] = self._migrate_node(node)
+        self._build_indexes()
+
+    @staticmethod
+    def needs_migration(raw_data):
+        """True for trees whose nodes still carry their payload inline."""
+        return any("data" in n for n in raw_data.get("nodes", {}).values())
+
+    def _migrate_node(self, node):
+        migrated = {k: v for k, v in node.items() if k != "data"}
+        migrated["ref"] = self._put_payload(node["data"])
+        return migrated
 
     def _migrate_legacy(self, old_list):
         parent = None
@@ -16,20 +54,69 @@ class HistoryTree:
             node_id = str(uuid.uuid4())[:8]
             self.nodes[node_id] = {
                 "id": node_id, "parent": parent, "timestamp": time.time(),
-                "data": item, "note": item.get("note", "Legacy Import")
+                "ref": self._put_payload(item), "note": item.get("note", "Legacy Import")
             }
             parent = node_id
         self.branches["main"] = parent
         self.head_id = parent
 
+    # --- BLOB STORE ---
+    def _put(self, value):
+        """Stores value once under the hash of its canonical JSON and returns the hash."""
+        raw = canonical_dumps(value)
+        key = hashlib.blake2b(raw, digest_size=10).hexdigest()
+        if key not in self.blobs:
+            # private copy in the original key order (raw is sorted), so later edits to value
+            # cannot reach history and restored files keep their layout
+            self.blobs[key] = loads(dumps(value, pretty=False))
+        return key
+
+    def _put_payload(self, data):
+        """
+        Root blob: {"fields": {...}, "refs": {key: "blob" | "seqs"}}. Scalars stay inline in
+        fields; dict/list values are replaced by their blob hash ("blob"), and batch_data by
+        the list of its sequences' hashes ("seqs"). Key order is preserved.
+        """
+        fields, refs = {}, {}
+        for key, value in data.items():
+            if key == "batch_data" and isinstance(value, list):
+                fields[key] = [self._put(item) for item in value]
+                refs[key] = "seqs"
+            elif isinstance(value, (dict, list)):
+                fields[key] = self._put(value)
+                refs[key] = "blob"
+            else:
+                fields[key] = value
+        return self._put({"fields": fields, "refs": refs})
+
+    def _root(self, node_id):
+        return self.blobs[self.nodes[node_id]["ref"]]
+
+    def get_data(self, node_id):
+        """Rebuilds the payload of a node as a fresh object the caller may modify, or None."""
+        if node_id not in self.nodes:
+            return None
+        root = self._root(node_id)
+        refs = root.get("refs", {})
+        data = {}
+        for key, value in root["fields"].items():
+            kind = refs.get(key)
+            if kind == "seqs":
+                value = [self.blobs[h] for h in value]
+            elif kind == "blob":
+                value = self.blobs[value]
+            data[key] = value
+        return copy.deepcopy(data)
+
     def commit(self, data, note="Snapshot"):
+        """Adds a snapshot of data on the active branch; an unchanged state returns the head instead."""
+        ref = self._put_payload(data)
+        if self.head_id in self.nodes and self.nodes[self.head_id].get("ref") == ref:
+            return self.head_id
+
         new_id = str(uuid.uuid4())[:8]
         
-        active_branch = None
-        for b_name, tip_id in self.branches.items():
-            if tip_id == self.head_id:
-                active_branch = b_name
-                break
+        active_branch = self.branch_of(self.head_id)
         
         if not active_branch:
             base_name = "branch"
@@ -37,22 +124,268 @@ class HistoryTree:
             while f"{base_name}_{count}" in self.branches: count += 1
             active_branch = f"{base_name}_{count}"
             
-        self.nodes[new_id] = {
+        node = {
             "id": new_id, "parent": self.head_id, "timestamp": time.time(),
-            "data": data, "note": note
+            "ref": ref, "note": note
         }
-        self.branches[active_branch] = new_id
+        self.nodes[new_id] = node
+        self._children.setdefault(self.head_id if self.head_id in self.nodes else None, []).append(new_id)
+        self._add_to_timeline(node)
+        self._set_tip(active_branch, new_id)
         self.head_id = new_id
         return new_id
 
     def checkout(self, node_id):
         if node_id in self.nodes:
             self.head_id = node_id
-            return self.nodes[node_id]["data"]
+            return self.get_data(node_id)
         return None
 
+    # --- INDEXES ---
+    def _build_indexes(self):
+        self._children = {}  # parent id (None for roots and orphans) -> child ids
+        for node_id, node in self.nodes.items():
+            parent = node.get("parent")
+            self._children.setdefault(parent if parent in self.nodes else None, []).append(node_id)
+        self._tip_branches = {}  # tip id -> branch names, in branch order
+        for name, tip in self.branches.items():
+            self._tip_branches.setdefault(tip, []).append(name)
+        self._timeline = sorted((n.get("timestamp", 0), node_id) for node_id, n in self.nodes.items())
+
+    def _add_to_timeline(self, node):
+        bisect.insort(self._timeline, (node.get("timestamp", 0), node["id"]))
+
+    def _remove_from_timeline(self, node):
+        entry = (node.get("timestamp", 0), node["id"])
+        pos = bisect.bisect_left(self._timeline, entry)
+        if pos < len(self._timeline) and self._timeline[pos] == entry:
+            del self._timeline[pos]
+
+    def _set_tip(self, name, tip):
+        if name in self.branches:
+            self._unlink_tip(name)
+        self.branches[name] = tip
+        self._tip_branches.setdefault(tip, []).append(name)
+
+    def _unlink_tip(self, name):
+        tip = self.branches[name]
+        names = self._tip_branches.get(tip, [])
+        if name in names:
+            names.remove(name)
+        if not names:
+            self._tip_branches.pop(tip, None)
+
+    def branch_of(self, node_id):
+        """Name of the (first) branch whose tip is node_id, or None."""
+        names = self._tip_branches.get(node_id)
+        return names[0] if names else None
+
+    def children(self, node_id):
+        return list(self._children.get(node_id, ()))
+
+    def nodes_by_time(self, reverse=False):
+        """Node dicts ordered by timestamp (newest first with reverse=True)."""
+        entries = reversed(self._timeline) if reverse else self._timeline
+        return [self.nodes[node_id] for _, node_id in entries]
+
+    def _parent_of(self, node_id):
+        parent = self.nodes[node_id].get("parent")
+        return parent if parent in self.nodes else None
+
+    def _move(self, node_id, new_parent):
+        siblings = self._children.get(self._parent_of(node_id), [])
+        if node_id in siblings:
+            siblings.remove(node_id)
+        self.nodes[node_id]["parent"] = new_parent
+        self._children.setdefault(new_parent, []).append(node_id)
+
+    def reparent(self, node_id, new_parent):
+        """
+        Moves node_id, with its subtree, under new_parent (None makes it a root).
+        Returns False, changing nothing, for unknown ids or a move under its own subtree.
+        """
+        if node_id not in self.nodes or (new_parent is not None and new_parent not in self.nodes):
+            return False
+        ancestor = new_parent
+        while ancestor is not None:
+            if ancestor == node_id:
+                return False
+            ancestor = self._parent_of(ancestor)
+        self._move(node_id, new_parent)
+        return True
+
+    def delete_node(self, node_id, subtree=False):
+        """
+        Removes node_id. Its children move up to its parent, or with subtree=True are removed
+        too. Branches ending on a removed node move back to that parent (or are dropped when
+        there is none); a removed head becomes the parent, else the newest remaining node.
+        Returns the removed ids.
+        """
+        if node_id not in self.nodes:
+            return []
+        parent = self._parent_of(node_id)
+        removed = [node_id]
+        if subtree:
+            stack = self.children(node_id)
+            while stack:
+                child = stack.pop()
+                removed.append(child)
+                stack.extend(self._children.get(child, ()))
+        else:
+            for child in self.children(node_id):
+                self._move(child, parent)
+
+        siblings = self._children.get(parent, [])
+        if node_id in siblings:
+            siblings.remove(node_id)
+        for rid in removed:
+            self._remove_from_timeline(self.nodes.pop(rid))
+            self._children.pop(rid, None)
+            for name in list(self._tip_branches.get(rid, ())):
+                if parent is not None:
+                    self._set_tip(name, parent)
+                else:
+                    self._unlink_tip(name)
+                    del self.branches[name]
+
+        if self.head_id in removed:
+            if parent is not None:
+                self.head_id = parent
+            else:
+                self.head_id = self._timeline[-1][1] if self._timeline else None
+        return removed
+
+    # --- DIFF ---
+    @staticmethod
+    def _diff_dicts(old, new):
+        """{"added": {k: new}, "removed": {k: old}, "changed": {k: (old, new)}} for two flat dicts."""
+        return {
+            "added": {k: v for k, v in new.items() if k not in old},
+            "removed": {k: v for k, v in old.items() if k not in new},
+            "changed": {k: (old[k], v) for k, v in new.items() if k in old and old[k] != v},
+        }
+
+    def _sequence_keys(self, hashes):
+        """sequence_number (or "#position" for duplicates/missing) -> blob hash, in batch order."""
+        keys = {}
+        for pos, h in enumerate(hashes):
+            seq = self.blobs[h]
+            key = seq.get("sequence_number", pos + 1) if isinstance(seq, dict) else pos + 1
+            if key in keys:
+                key = f"#{pos + 1}"
+            keys[key] = h
+        return keys
+
+    def diff(self, old_id, new_id):
+        """
+        What changed from node old_id to node new_id:
+          {"fields": <_diff_dicts of the top-level keys other than batch_data>,
+           "sequences": {"added": [keys], "removed": [keys], "changed": {key: <_diff_dicts>}}}
+        Sequences are matched by sequence_number and compared by blob hash first, so only
+        the ones that actually changed are opened.
+        """
+        old_root, new_root = self._root(old_id), self._root(new_id)
+        report = {"fields": self._diff_dicts({}, {}), "sequences": {"added": [], "removed": [], "changed": {}}}
+        if old_root is new_root:
+            return report
+
+        def top_level(root):
+            refs = root.get("refs", {})
+            return {k: v for k, v in root["fields"].items() if refs.get(k) != "seqs"}
+
+        def resolve(root, key):
+            value = root["fields"][key]
+            return self.blobs[value] if root.get("refs", {}).get(key) == "blob" else value
+
+        # stored values are hashes for dict/list fields, so equal hashes skip the lookup
+        fields = self._diff_dicts(top_level(old_root), top_level(new_root))
+        report["fields"] = {
+            "added": {k: resolve(new_root, k) for k in fields["added"]},
+            "removed": {k: resolve(old_root, k) for k in fields["removed"]},
+            "changed": {k: (resolve(old_root, k), resolve(new_root, k)) for k in fields["changed"]},
+        }
+        report["fields"]["changed"] = {k: v for k, v in report["fields"]["changed"].items() if v[0] != v[1]}
+
+        old_seqs = old_root["fields"].get("batch_data") if old_root.get("refs", {}).get("batch_data") == "seqs" else []
+        new_seqs = new_root["fields"].get("batch_data") if new_root.get("refs", {}).get("batch_data") == "seqs" else []
+        if old_seqs == new_seqs:
+            return report
+        old_keys, new_keys = self._sequence_keys(old_seqs), self._sequence_keys(new_seqs)
+        sequences = report["sequences"]
+        sequences["added"] = [k for k in new_keys if k not in old_keys]
+        sequences["removed"] = [k for k in old_keys if k not in new_keys]
+        for key, h in new_keys.items():
+            if key in old_keys and old_keys[key] != h:
+                changes = self._diff_dicts(self.blobs[old_keys[key]], self.blobs[h])
+                if any(changes.values()):  # equal content under different hashes is no change
+                    sequences["changed"][key] = changes
+        return report
+
     def to_dict(self):
-        return {"nodes": self.nodes, "branches": self.branches, "head_id": self.head_id}
+        """Serializable tree; blobs no remaining node refers to are left out."""
+        live = {}
+        for node in self.nodes.values():
+            ref = node.get("ref")
+            if ref in live or ref not in self.blobs:
+                continue
+            root = live[ref] = self.blobs[ref]
+            for key, kind in root.get("refs", {}).items():
+                hashes = root["fields"][key] if kind == "seqs" else [root["fields"][key]]
+                for h in hashes:
+                    live[h] = self.blobs[h]
+        return {"nodes": self.nodes, "branches": self.branches, "head_id": self.head_id, "blobs": live}
+
+    # --- SIDECAR STORAGE ---
+    @staticmethod
+    def sidecar_path(path):
+        """
+        a.json -> a.json.history.json, so a.json, a.jsonl and a.json.gz each get their own;
+        compressed files keep their codec (a.json.gz -> a.json.gz.history.json.gz).
+        """
+        path = str(path)
+        compressed = os.path.splitext(path)[1] if compression_for(path) else ""
+        return f"{path}.history.json{compressed}"
+
+    @staticmethod
+    def _legacy_sidecar_path(path):
+        """Earlier name, shared by every data file with the same stem (a.history.json); read-only fallback."""
+        path = str(path)
+        stem = path
+        for suffix in DATA_SUFFIXES:
+            if path.endswith(suffix):
+                stem = path[:-len(suffix)]
+                break
+        compressed = os.path.splitext(path)[1] if compression_for(path) else ""
+        return f"{stem}.history.json{compressed}"
+
+    @staticmethod
+    def read_sidecar(path):
+        """Returns {history_tree, prompt_history} from the sidecar ({} if there is none)."""
+        sidecar = HistoryTree.sidecar_path(path)
+        for candidate in (sidecar, HistoryTree._legacy_sidecar_path(path)):
+            try:
+                with open(candidate, 'rb') as f:
+                    raw = f.read()
+                break
+            except FileNotFoundError:
+                continue
+        else:
+            return {}
+        if candidate == sidecar:
+            _SIDECAR_DIGESTS[sidecar] = hashlib.sha1(raw).hexdigest()
+        return loads(decompress(raw))
+
+    @staticmethod
+    def write_sidecar(path, history, pretty=True):
+        """Writes the history keys to the sidecar atomically, unless it already holds exactly these bytes."""
+        sidecar = HistoryTree.sidecar_path(path)
+        payload = compress_for(sidecar, dumps({k: history[k] for k in HISTORY_KEYS if k in history}, pretty))
+        digest = hashlib.sha1(payload).hexdigest()
+        if _SIDECAR_DIGESTS.get(sidecar) == digest and os.path.exists(sidecar):
+            return False
+        atomic_write(sidecar, payload)
+        _SIDECAR_DIGESTS[sidecar] = digest
+        return True
 
     # --- UPDATED GRAPH GENERATOR ---
     def generate_graph(self, direction="LR"):
@@ -75,9 +408,7 @@ class HistoryTree:
             '  edge [color="#888888", arrowsize=0.6, penwidth=1.0];'
         ]
         
-        sorted_nodes = sorted(self.nodes.values(), key=lambda x: x["timestamp"])
-        
-        for n in sorted_nodes:
+        for n in self.nodes_by_time():
             nid = n["id"]
             full_note = n.get('note', 'Step')
             
@@ -92,7 +423,7 @@ class HistoryTree:
                 bg_color = "#fff6cd" # Yellow for Current
                 border_color = "#eebb00"
                 border_width = "2"
-            elif nid in self.branches.values():
+            elif self.branch_of(nid) is not None:
                 bg_color = "#e6ffe6" # Green for Tips
                 border_color = "#66aa66"
 
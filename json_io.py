@@ -0,0 +1,329 @@
+import contextlib
+import gzip
+import json
+import math
+import os
+import tempfile
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, atomic replace still applies
+    fcntl = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Shared by the Streamlit editor (utils.py) and the ComfyUI nodes (json_loader.py), so it
+# must not import streamlit or anything from either side.
+
+# ==========================================
+# 1. ADVISORY LOCKS
+# ==========================================
+
+def lock_path(path):
+    # realpath so the editor and the nodes agree on the lock even through symlinks
+    return os.path.realpath(path) + ".lock"
+
+
+@contextlib.contextmanager
+def locked(path, exclusive=False):
+    """
+    Holds an flock on <path>.lock for the duration of the block: shared for readers,
+    exclusive for writers. Without fcntl, or when the lock file cannot be created
+    (read-only share), the block simply runs unlocked.
+    """
+    if fcntl is None:
+        yield
+        return
+    try:
+        fd = os.open(lock_path(path), os.O_RDWR | os.O_CREAT, 0o666)
+    except OSError:
+        yield
+        return
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield
+    finally:
+        os.close(fd)  # closing the descriptor releases the lock
+
+
+# ==========================================
+# 2. ATOMIC WRITES
+# ==========================================
+
+def _file_mode(path):
+    try:
+        return os.stat(path).st_mode & 0o777
+    except OSError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def atomic_write(path, payload, lock=True):
+    """
+    Replaces path with payload (str or bytes) so readers only ever see the old or the new
+    file: write a temp file in the same folder, fsync it, then os.replace() it into place.
+    Runs under the exclusive lock (lock=False for private cache files) and keeps the
+    permissions of the file being replaced. A symlinked path is written through to its target.
+    """
+    path = os.path.realpath(path)
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    folder = os.path.dirname(path)
+    with locked(path, exclusive=True) if lock else contextlib.nullcontext():
+        fd, tmp = tempfile.mkstemp(dir=folder, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp, _file_mode(path))
+            os.replace(tmp, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp)
+            raise
+        _fsync_dir(folder)
+
+
+def append_line(path, line, lock=True):
+    """
+    Appends one line (str or bytes, without the newline) under the exclusive lock (lock=False
+    when the caller already holds it) and fsyncs it. A file whose last line lacks its newline
+    gets one first, so lines never merge.
+    """
+    if isinstance(line, str):
+        line = line.encode("utf-8")
+    payload = line + b"\n"
+    with locked(path, exclusive=True) if lock else contextlib.nullcontext(), open(path, 'ab+') as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell():
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                payload = b"\n" + payload
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _fsync_dir(folder):
+    """Persists the rename itself; not supported on every platform/filesystem."""
+    try:
+        fd = os.open(folder, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+# ==========================================
+# 3. SERIALIZER (orjson When Installed)
+# ==========================================
+
+# "auto" uses orjson when it is installed, "json" forces the standard library.
+SERIALIZER = "auto"
+
+
+def backend():
+    return "orjson" if orjson is not None and SERIALIZER != "json" else "json"
+
+
+# orjson turns integers outside 64 bits into floats instead of failing. Any run of 19 digits
+# (-10**18 is already past the int64 minimum) sends the text to the stdlib parser; mapping
+# every digit to "0" and searching for the run is several times faster than a regex.
+_DIGITS_TO_ZERO = bytes.maketrans(b"123456789", b"000000000")
+_WIDE_INT_RUN = b"0" * 19
+
+
+def _has_wide_int(raw):
+    if isinstance(raw, str):
+        raw = raw.encode("utf-8", "surrogatepass")
+    return _WIDE_INT_RUN in raw.translate(_DIGITS_TO_ZERO)
+
+
+def _has_non_finite(obj):
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+def dumps(obj, pretty=True):
+    """
+    Serializes obj to UTF-8 bytes. pretty=True indents (4 spaces with the stdlib, 2 with
+    orjson, which supports no other width); pretty=False writes compact output. Documents
+    the stdlib would write differently (NaN/Infinity, ints beyond 64 bits) always go through it.
+    """
+    if backend() == "orjson":
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        try:
+            out = orjson.dumps(obj, option=option)
+        except TypeError:
+            out = None  # e.g. ints beyond 64 bits: the stdlib below handles them
+        # orjson writes NaN/Infinity as null; the stdlib keeps them, so such documents use it
+        if out is not None and not (b"null" in out and _has_non_finite(obj)):
+            return out
+    if pretty:
+        return json.dumps(obj, indent=4).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def canonical_dumps(obj):
+    """
+    Compact, sorted-key, ASCII-escaped bytes, so equal objects serialize (and hash) the same
+    way. Always the stdlib: orjson's UTF-8 and float output would give other bytes.
+    """
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=True).encode("ascii")
+
+
+def loads(raw):
+    """
+    Parses bytes or str. Falls back to the stdlib for its extensions (NaN, Infinity) and for
+    integers wider than 64 bits, which orjson would load as floats.
+    """
+    if backend() == "orjson" and not _has_wide_int(raw):
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(raw)
+
+
+
+# ==========================================
+# 4. COMPRESSION (.json.gz / .json.zst)
+# ==========================================
+
+# File suffix -> codec used when writing. Reading sniffs the magic bytes instead, so a file
+# (or an HTTP body) is decoded correctly whatever it is called.
+COMPRESSIONS = {".gz": "gzip", ".zst": "zstd"}
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def compression_for(path):
+    """'gzip', 'zstd' or None, from the file name."""
+    return COMPRESSIONS.get(os.path.splitext(os.fspath(path))[1].lower())
+
+
+def available_compressions():
+    return ["gzip"] + (["zstd"] if zstandard is not None else [])
+
+
+def _require_zstandard():
+    if zstandard is None:
+        raise RuntimeError("reading/writing .zst files needs the zstandard package (pip install zstandard)")
+
+
+def compress_for(path, payload):
+    """Compresses payload (bytes) as the file name asks; other paths get it back unchanged."""
+    method = compression_for(path)
+    if method == "gzip":
+        # mtime=0 keeps the output byte-identical for identical content
+        return gzip.compress(payload, compresslevel=GZIP_LEVEL, mtime=0)
+    if method == "zstd":
+        _require_zstandard()
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(payload)
+    return payload
+
+
+def decompress(raw):
+    """Decodes gzip/zstd data by its magic bytes; anything else is returned unchanged."""
+    if raw[:2] == _GZIP_MAGIC:
+        return gzip.decompress(raw)
+    if raw[:4] == _ZSTD_MAGIC:
+        _require_zstandard()
+        return zstandard.ZstdDecompressor().decompressobj().decompress(raw)
+    return raw
+
+
+def read_bytes(path):
+    with open(path, 'rb') as f:
+        return decompress(f.read())
+
+
+def load(path):
+    return loads(read_bytes(path))
+
+
+# ==========================================
+# 5. BATCH EDIT JOURNAL
+# ==========================================
+
+# The editor records batch edits as one JSON op per line in <name>.journal.jsonl, guarded by
+# the data file's lock, and folds them into the file now and then. Readers replay the ops
+# still pending, so they see the same batch whether or not the journal was compacted yet.
+#   {"op": "append", "item": {...}}             {"op": "insert", "index": i, "item": {...}}
+#   {"op": "set", "index": i, "item": {...}}    {"op": "delete", "index": i}
+JOURNAL_SUFFIX = ".journal.jsonl"
+
+
+def journal_path(path):
+    return os.fspath(path) + JOURNAL_SUFFIX
+
+
+def read_journal(path):
+    """The ops in a journal file ([] when there is none). A torn last line is ignored."""
+    try:
+        with open(path, 'rb') as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return []
+    ops = []
+    for n, line in enumerate(lines):
+        if not line.strip():
+            continue
+        try:
+            ops.append(loads(line))
+        except ValueError:
+            if n != len(lines) - 1:
+                raise
+    return ops
+
+
+def apply_batch_ops(data, ops):
+    """Replays journal ops on data["batch_data"] in place; out-of-range indexes are skipped."""
+    batch = data.setdefault("batch_data", [])
+    for op in ops:
+        kind, index = op.get("op"), op.get("index", 0)
+        if kind == "append":
+            batch.append(op["item"])
+        elif kind == "insert":
+            batch.insert(index, op["item"])
+        elif kind == "set" and 0 <= index < len(batch):
+            batch[index] = op["item"]
+        elif kind == "delete" and 0 <= index < len(batch):
+            del batch[index]
+    return data
+
+
+def sequence_key(item):
+    """str(int(sequence_number)) of a batch item, or None; the one rule every sequence map uses."""
+    if isinstance(item, dict) and "sequence_number" in item:
+        try:
+            return str(int(item["sequence_number"]))
+        except (TypeError, ValueError):
+            pass
+    return None
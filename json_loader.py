@@ -1,17 +1,1217 @@
+import functools
+import glob
+import hashlib
 import json
+import mmap
 import os
+import re
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from array import array
+from collections import OrderedDict
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from .json_io import (
+        atomic_write, locked, dumps, loads, decompress, compression_for,
+        JOURNAL_SUFFIX, journal_path, read_journal, apply_batch_ops, sequence_key
+    )
+except ImportError:  # imported as a plain module (benchmarks, scripts)
+    from json_io import (
+        atomic_write, locked, dumps, loads, decompress, compression_for,
+        JOURNAL_SUFFIX, journal_path, read_journal, apply_batch_ops, sequence_key
+    )
+
+# ==========================================
+# 0. SHARED DOCUMENT CACHE
+# ==========================================
+
+# Upper bound for the bytes of source JSON kept parsed in memory (all nodes share it).
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Batch files at least this large are read through a sidecar offset index (file.json.idx)
+# that decodes only the requested sequence. Set to 0 to always parse the whole file.
+INDEX_MIN_BYTES = 16 * 1024 * 1024
+
+# Cached batches with at least this many sequences are stored column-wise (ColumnarBatch):
+# key names once, ints/floats in typed arrays, repeated strings shared. Set to 0 to disable.
+COLUMNAR_MIN_ROWS = 512
+
+# Opt-in: watch the folders of recently used files (inotify via the optional `watchdog`
+# package, else a polling thread) so loader calls on unchanged files skip the stat entirely.
+WATCH_FILES = False
+WATCH_POLL_INTERVAL = 2.0
+WATCH_MAX_DIRS = 64
+
+# Opt-in: after a batch node serves sequence N, revalidate the file and decode N+1 on a
+# background thread so the next queued prompt finds it in memory.
+PREFETCH_NEXT = False
+
+# json_path may also be an http(s):// URL. Responses are revalidated with
+# If-None-Match / If-Modified-Since at most once per HTTP_REVALIDATE_SECONDS.
+HTTP_TIMEOUT = 10.0
+HTTP_REVALIDATE_SECONDS = 1.0
+
+SEQUENCE_LOOKUPS = ["position", "sequence_number"]
+
+
+class FrozenDict(dict):
+    """Read-only dict handed out by the cache so one node cannot corrupt another's view."""
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("cached JSON data is read-only")
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def copy(self):
+        return dict(self)
+
+
+class FrozenList(list):
+    """Read-only list counterpart of FrozenDict. Also memoizes the sequence_number lookup map."""
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("cached JSON data is read-only")
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = extend = insert = pop = remove = clear = sort = reverse = _readonly
+
+    def __copy__(self):
+        return list(self)
+
+    def sequence_map(self):
+        seq_map = self.__dict__.get("_sequence_map")
+        if seq_map is None:
+            seq_map = build_sequence_map(self)
+            self.__dict__["_sequence_map"] = seq_map
+        return seq_map
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def copy(self):
+        return list(self)
+
+
+def freeze(value):
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(v) for v in value)
+    return value
+
+
+def build_sequence_map(batch):
+    """Maps str(sequence_number) -> list position; the first entry wins on duplicates."""
+    seq_map = {}
+    for i, item in enumerate(batch):
+        key = sequence_key(item)
+        if key is not None:
+            seq_map.setdefault(key, i)
+    return seq_map
+
+
+def thaw(value):
+    """Returns a plain, mutable deep copy of a frozen tree."""
+    if isinstance(value, dict):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, (list, ColumnarBatch)):
+        return [thaw(v) for v in value]
+    return value
+
+
+_MISSING = object()
+
+
+def _build_column(values, pool):
+    """Packs one field: typed array when every row has the same numeric type, else a list."""
+    kinds = {type(v) for v in values}
+    if kinds == {int} and all(-2**63 <= v < 2**63 for v in values):
+        return array('q', values)
+    if kinds == {float}:
+        return array('d', values)
+    return [pool.setdefault(v, v) if type(v) is str else freeze(v) for v in values]
+
+
+class ColumnarBatch(Sequence):
+    """
+    Read-only, column-oriented batch_data for large cached files. Key names are stored once,
+    numeric fields live in typed arrays and equal strings share one object, so a sequence costs
+    a slot per column instead of a whole dict. Indexing builds a FrozenDict row on demand.
+    """
+    def __init__(self, rows):
+        order = {}
+        for row in rows:
+            order.update(dict.fromkeys(row))
+        pool = {}
+        self.keys = tuple(order)
+        self.columns = {k: _build_column([row.get(k, _MISSING) for row in rows], pool) for k in self.keys}
+        self._length = len(rows)
+
+    def __len__(self):
+        return self._length
+
+    def row(self, pos):
+        return FrozenDict(
+            (k, v) for k, v in zip(self.keys, (col[pos] for col in self.columns.values())) if v is not _MISSING
+        )
+
+    def __getitem__(self, pos):
+        if isinstance(pos, slice):
+            return FrozenList(self.row(i) for i in range(*pos.indices(self._length)))
+        if pos < 0:
+            pos += self._length
+        if not 0 <= pos < self._length:
+            raise IndexError("batch index out of range")
+        return self.row(pos)
+
+    def __iter__(self):
+        return (self.row(i) for i in range(self._length))
+
+    def column(self, key, default=None):
+        """All values of one field in row order (default where a row lacks it), without building rows."""
+        col = self.columns.get(key)
+        if col is None:
+            return [default] * self._length
+        if isinstance(col, array):
+            return col
+        return [default if v is _MISSING else v for v in col]
+
+    def sequence_map(self):
+        seq_map = self.__dict__.get("_sequence_map")
+        if seq_map is None:
+            seq_map = {}
+            for i, n in enumerate(self.column("sequence_number", _MISSING)):
+                if n is _MISSING:
+                    continue
+                try:
+                    seq_map.setdefault(str(int(n)), i)
+                except (TypeError, ValueError):
+                    pass
+            self.__dict__["_sequence_map"] = seq_map
+        return seq_map
+
+    def __copy__(self):
+        return thaw(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def copy(self):
+        return thaw(self)
+
+
+BATCH_TYPES = (list, ColumnarBatch)
+
+
+def freeze_document(value):
+    """freeze() for a whole parsed file; a batch_data of COLUMNAR_MIN_ROWS+ sequences goes column-wise."""
+    if COLUMNAR_MIN_ROWS and isinstance(value, dict):
+        batch = value.get("batch_data")
+        if isinstance(batch, list) and len(batch) >= COLUMNAR_MIN_ROWS and all(isinstance(r, dict) for r in batch):
+            return FrozenDict((k, ColumnarBatch(v) if k == "batch_data" else freeze(v)) for k, v in value.items())
+    return freeze(value)
+
+
+def json_default(value):
+    """json.dumps fallback used for fingerprints: expands ColumnarBatch, stringifies the rest."""
+    if isinstance(value, ColumnarBatch):
+        return list(value)
+    return str(value)
+
+
+class DocumentCache:
+    """
+    Process-wide parsed-document cache.
+    Entries are keyed on (realpath, mtime_ns, size) so any write to the file misses,
+    and evicted least-recently-used once the summed file sizes exceed max_bytes.
+    """
+    def __init__(self, max_bytes=CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()  # realpath -> (stamp, size, doc)
+        self._lock = threading.Lock()
+
+    def get(self, path, stamp):
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != stamp:
+                return None
+            self._entries.move_to_end(path)
+            return entry[2]
+
+    def put(self, path, stamp, size, doc):
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self.total_bytes -= old[1]
+            if size > self.max_bytes:
+                return
+            self._entries[path] = (stamp, size, doc)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes and self._entries:
+                _, (_, old_size, _) = self._entries.popitem(last=False)
+                self.total_bytes -= old_size
+
+    def discard(self, path):
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self.total_bytes -= old[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+
+_DOC_CACHE = DocumentCache()
+_EMPTY = FrozenDict()
+
+
+class LoaderStats:
+    """Cheap hot-path counters, served as JSON on /json_manager/stats inside ComfyUI."""
+    # Upper bounds (ms) of the parse time histogram buckets; the last bucket is open-ended.
+    PARSE_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self.calls = {}
+            self.call_seconds = {}
+            self.bytes_parsed = 0
+            self.parses = 0
+            self.parse_seconds = 0.0
+            self.parse_histogram = [0] * (len(self.PARSE_BUCKETS_MS) + 1)
+            self.cache_hits = 0
+            self.cache_misses = 0
+            self.not_found = 0
+            self.errors = 0
+            self.prefetches = 0
+            self.http_requests = 0
+            self.http_not_modified = 0
+
+    def count_call(self, node, seconds):
+        with self._lock:
+            self.calls[node] = self.calls.get(node, 0) + 1
+            self.call_seconds[node] = self.call_seconds.get(node, 0.0) + seconds
+
+    def count_parse(self, nbytes, seconds):
+        ms = seconds * 1000
+        bucket = len(self.PARSE_BUCKETS_MS)
+        for i, bound in enumerate(self.PARSE_BUCKETS_MS):
+            if ms <= bound:
+                bucket = i
+                break
+        with self._lock:
+            self.parses += 1
+            self.bytes_parsed += nbytes
+            self.parse_seconds += seconds
+            self.parse_histogram[bucket] += 1
+
+    def count(self, field):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def snapshot(self):
+        with self._lock:
+            labels = [f"<={b}ms" for b in self.PARSE_BUCKETS_MS] + [f">{self.PARSE_BUCKETS_MS[-1]}ms"]
+            return {
+                "since": self.started,
+                "calls": dict(self.calls),
+                "call_seconds": dict(self.call_seconds),
+                "parses": self.parses,
+                "bytes_parsed": self.bytes_parsed,
+                "parse_seconds": self.parse_seconds,
+                "parse_histogram": dict(zip(labels, self.parse_histogram)),
+                "cache_hits": self.cache_hits,
+                "cache_misses": self.cache_misses,
+                "cache_bytes": _DOC_CACHE.total_bytes,
+                "file_not_found": self.not_found,
+                "errors": self.errors,
+                "prefetches": self.prefetches,
+                "http_requests": self.http_requests,
+                "http_not_modified": self.http_not_modified,
+            }
+
+
+STATS = LoaderStats()
+
+# ==========================================
+# 0a. FILE WATCHER (Optional)
+# ==========================================
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+
+class _WatchHandler(FileSystemEventHandler):
+    # "opened" / "closed_no_write" come from every read, the loader's own included
+    CHANGE_EVENTS = {"created", "modified", "moved", "deleted", "closed"}
+
+    def __init__(self, watcher):
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        if event.event_type not in self.CHANGE_EVENTS:
+            return
+        for path in (event.src_path, getattr(event, "dest_path", None)):
+            if path and not _is_scratch_file(os.fsdecode(path)):
+                self.watcher.invalidate(os.fsdecode(path))
+
+
+def _is_scratch_file(path):
+    """Lock files, .idx sidecars and atomic_write temp files never change the data itself."""
+    name = os.path.basename(path)
+    return name.endswith((".lock", ".idx")) or (name.startswith(".") and name.endswith(".tmp"))
+
+
+class FileWatcher:
+    """
+    Remembers (realpath, stamp) for each json_path until a change event arrives for it.
+    Uses watchdog (inotify on Linux) when installed; otherwise a daemon thread re-stats the
+    tracked files every WATCH_POLL_INTERVAL seconds, off ComfyUI's executor thread.
+    """
+    def __init__(self):
+        self._clean = {}               # json_path -> (real_path, stamp)
+        self._by_real = {}             # real_path -> set of json_paths
+        self._dirs = OrderedDict()     # watched dir -> watchdog handle (None when polling)
+        self._lock = threading.Lock()
+        self._observer = None
+        self._poller = None
+        self._generation = 0           # bumped by every change event
+
+    def resolve(self, json_path):
+        with self._lock:
+            return self._clean.get(json_path)
+
+    def watch(self, real_path):
+        """
+        Starts watching the file's folder; call before taking its stamp. Returns a token for
+        track(), which drops the stamp if any change event arrived in between.
+        """
+        with self._lock:
+            self._watch_dir(os.path.dirname(real_path))
+            return self._generation
+
+    def track(self, json_path, real_path, stamp, token):
+        with self._lock:
+            if token != self._generation:
+                return  # something changed while the stamp was taken; stat again next time
+            self._clean[json_path] = (real_path, stamp)
+            self._by_real.setdefault(real_path, set()).add(json_path)
+            self._watch_dir(os.path.dirname(real_path))
+
+    def invalidate(self, path):
+        if path.endswith(JOURNAL_SUFFIX):  # journaled edits change the data file they belong to
+            path = path[:-len(JOURNAL_SUFFIX)]
+        real_path = os.path.realpath(path)
+        with self._lock:
+            self._generation += 1
+            for json_path in self._by_real.pop(real_path, ()):
+                self._clean.pop(json_path, None)
+        _DOC_CACHE.discard(real_path)
+
+    def _watch_dir(self, folder):
+        if folder in self._dirs:
+            self._dirs.move_to_end(folder)
+            return
+        handle = None
+        if Observer is not None:
+            if self._observer is None:
+                self._observer = Observer()
+                self._observer.daemon = True
+                self._observer.start()
+            try:
+                handle = self._observer.schedule(_WatchHandler(self), folder, recursive=False)
+            except OSError as e:
+                print(f"[JSON Loader] Watch Error: {e}")
+        elif self._poller is None:
+            self._poller = threading.Thread(target=self._poll, name="json-loader-watch", daemon=True)
+            self._poller.start()
+        self._dirs[folder] = handle
+
+        while len(self._dirs) > WATCH_MAX_DIRS:
+            old_dir, old_handle = self._dirs.popitem(last=False)
+            if old_handle is not None:
+                self._observer.unschedule(old_handle)
+            for real_path in [p for p in self._by_real if os.path.dirname(p) == old_dir]:
+                for json_path in self._by_real.pop(real_path):
+                    self._clean.pop(json_path, None)
+
+    def _poll(self):
+        while True:
+            time.sleep(WATCH_POLL_INTERVAL)
+            with self._lock:
+                tracked = dict(self._clean.values())
+            for real_path, stamp in tracked.items():
+                try:
+                    current = source_stamp(real_path)
+                except OSError:
+                    current = None
+                if current != stamp:
+                    self.invalidate(real_path)
+
+
+_WATCHER = FileWatcher()
+
+
+def journal_stamp(real_path):
+    """(mtime_ns, size) of the file's pending edit journal (see json_io), or () when there is none."""
+    try:
+        st = os.stat(journal_path(real_path))
+    except OSError:
+        return ()
+    return (st.st_mtime_ns, st.st_size)
+
+
+def source_stamp(real_path):
+    """(mtime_ns, size), extended with the journal's while one exists. Raises OSError."""
+    st = os.stat(real_path)
+    return (st.st_mtime_ns, st.st_size) + journal_stamp(real_path)
+
+
+def stat_source(json_path):
+    """Returns (realpath, stamp) for a loader input (see source_stamp), or None if it cannot be read."""
+    if is_url(json_path):
+        return None
+    if WATCH_FILES:
+        known = _WATCHER.resolve(json_path)
+        if known is not None:
+            return known
+    try:
+        real_path = os.path.realpath(json_path)
+        # watch first: a write landing between the stat and the watch would never be reported
+        token = _WATCHER.watch(real_path) if WATCH_FILES else None
+        stamp = source_stamp(real_path)
+    except (OSError, ValueError):
+        return None
+    if WATCH_FILES:
+        _WATCHER.track(json_path, real_path, stamp, token)
+    return real_path, stamp
+
+
+def fd_stamp(f):
+    """(mtime_ns, size) of the file actually opened, which may be newer than an earlier stat."""
+    st = os.fstat(f.fileno())
+    return (st.st_mtime_ns, st.st_size)
+
+
+# ==========================================
+# 0b. HTTP SOURCES (Conditional GET)
+# ==========================================
+
+try:
+    import requests
+except ImportError:
+    requests = None
+
+_HTTP_STATE = {}  # url -> {"validators": (etag, last_modified), "checked": time}
+_HTTP_LOCK = threading.Lock()
+_HTTP_LOCAL = threading.local()
+
+
+def is_url(json_path):
+    return json_path.startswith(("http://", "https://"))
+
+
+def _http_get(url, headers):
+    """Returns (status, headers, body) through a pooled per-thread requests.Session (urllib fallback)."""
+    if requests is not None:
+        session = getattr(_HTTP_LOCAL, "session", None)
+        if session is None:
+            session = _HTTP_LOCAL.session = requests.Session()
+        resp = session.get(url, headers=headers, timeout=HTTP_TIMEOUT)
+        return resp.status_code, resp.headers, resp.content
+    req = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(req, timeout=HTTP_TIMEOUT) as resp:
+            return resp.status, resp.headers, resp.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, b""
+
+
+def read_http_json(url):
+    """
+    Fetches a JSON document over HTTP(S), keeping the parsed body in the shared cache.
+    A 304 reply re-uses the cached document; network errors fall back to the last good copy.
+    """
+    with _HTTP_LOCK:
+        state = dict(_HTTP_STATE.get(url, {}))
+    validators = state.get("validators")
+    doc = _DOC_CACHE.get(url, validators) if validators is not None else None
+    if doc is not None and time.time() - state.get("checked", 0) < HTTP_REVALIDATE_SECONDS:
+        STATS.count("cache_hits")
+        return doc
+
+    headers = {"Accept": "application/json"}
+    if doc is not None:
+        etag, last_modified = validators
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+    try:
+        STATS.count("http_requests")
+        status, resp_headers, body = _http_get(url, headers)
+    except Exception as e:
+        STATS.count("errors")
+        print(f"[JSON Loader] HTTP Error: {e}")
+        return doc if doc is not None else _EMPTY
+
+    if status == 304 and doc is not None:
+        STATS.count("http_not_modified")
+        STATS.count("cache_hits")
+        with _HTTP_LOCK:
+            _HTTP_STATE[url] = {"validators": validators, "checked": time.time()}
+        return doc
+
+    if status != 200:
+        STATS.count("not_found" if status == 404 else "errors")
+        print(f"[JSON Loader] Warning: HTTP {status} for {url}")
+        return doc if doc is not None else _EMPTY
+
+    STATS.count("cache_misses")
+    try:
+        t0 = time.perf_counter()
+        body = decompress(body)  # .json.gz / .json.zst served as-is
+        doc = freeze_document(parse_jsonl(body) if is_jsonl(url) else loads(body))
+        STATS.count_parse(len(body), time.perf_counter() - t0)
+    except Exception as e:
+        STATS.count("errors")
+        print(f"[JSON Loader] Error: {e}")
+        return _EMPTY
+
+    validators = (resp_headers.get("ETag"), resp_headers.get("Last-Modified"))
+    _DOC_CACHE.put(url, validators, len(body), doc)
+    with _HTTP_LOCK:
+        _HTTP_STATE[url] = {"validators": validators, "checked": time.time()}
+    return doc
+
 
 # --- Shared Helper ---
 def read_json_data(json_path):
-    if not os.path.exists(json_path):
+    """Returns the parsed file as a read-only FrozenDict/FrozenList tree ({} on error)."""
+    if is_url(json_path):
+        return read_http_json(json_path)
+    source = stat_source(json_path)
+    if source is None:
+        STATS.count("not_found")
         print(f"[JSON Loader] Warning: File not found at {json_path}")
-        return {}
+        return _EMPTY
+
+    real_path, stamp = source
+    doc = _DOC_CACHE.get(real_path, stamp)
+    if doc is not None:
+        STATS.count("cache_hits")
+        return doc
+    STATS.count("cache_misses")
+
     try:
-        with open(json_path, 'r') as f:
-            return json.load(f)
+        t0 = time.perf_counter()
+        # Shared lock: waits out an editor write in progress (see json_io)
+        with locked(real_path), open(real_path, 'rb') as f:
+            stamp = fd_stamp(f) + journal_stamp(real_path)
+            raw = decompress(f.read())  # .json.gz / .json.zst
+            ops = read_journal(journal_path(real_path))
+        doc = parse_jsonl(raw) if is_jsonl(json_path) else loads(raw)
+        if ops and isinstance(doc, dict):
+            apply_batch_ops(doc, ops)  # batch edits the editor has not compacted yet
+        doc = freeze_document(doc)
+        STATS.count_parse(len(raw), time.perf_counter() - t0)
     except Exception as e:
+        STATS.count("errors")
         print(f"[JSON Loader] Error: {e}")
-        return {}
+        return _EMPTY
+
+    _DOC_CACHE.put(real_path, stamp, len(raw), doc)
+    return doc
+
+# ==========================================
+# 0c. SIDECAR BATCH INDEX (Huge Files)
+# ==========================================
+
+_WS = re.compile(r'[ \t\n\r]*')
+
+
+class BatchIndex:
+    """
+    Byte offsets of every batch_data element plus a sequence_number -> position map.
+    Persisted next to the file as <file>.idx and rebuilt whenever mtime/size change.
+    """
+    def __init__(self, stamp, offsets, by_sequence):
+        self.stamp = stamp
+        self.offsets = offsets          # flat [start0, end0, start1, end1, ...]
+        self.by_sequence = by_sequence  # str(sequence_number) -> position
+
+    def __len__(self):
+        return len(self.offsets) // 2
+
+    def to_dict(self):
+        return {
+            "mtime_ns": self.stamp[0], "size": self.stamp[1],
+            "offsets": self.offsets, "by_sequence": self.by_sequence
+        }
+
+    @classmethod
+    def from_dict(cls, raw):
+        return cls((raw["mtime_ns"], raw["size"]), raw["offsets"], raw["by_sequence"])
+
+
+def _scan_batch_offsets(text):
+    """
+    Walks the top-level object of a latin-1 decoded file (so str indices equal byte offsets)
+    and returns (offsets, by_sequence) for batch_data, or None if the file has no batch list.
+    """
+    dec = json.JSONDecoder(strict=False)
+    pos = _WS.match(text, 0).end()
+    if text[pos:pos + 1] != '{':
+        return None
+    pos = _WS.match(text, pos + 1).end()
+    while text[pos:pos + 1] == '"':
+        key, pos = dec.raw_decode(text, pos)
+        pos = _WS.match(text, pos).end() + 1  # ':'
+        pos = _WS.match(text, pos).end()
+        if key == "batch_data" and text[pos:pos + 1] == '[':
+            offsets, by_sequence = [], {}
+            pos = _WS.match(text, pos + 1).end()
+            while text[pos:pos + 1] not in (']', ''):
+                item, end = dec.raw_decode(text, pos)
+                key = sequence_key(item)
+                if key is not None:
+                    by_sequence.setdefault(key, len(offsets) // 2)
+                offsets += [pos, end]
+                pos = _WS.match(text, end).end()
+                if text[pos:pos + 1] == ',':
+                    pos = _WS.match(text, pos + 1).end()
+            return offsets, by_sequence
+        _, pos = dec.raw_decode(text, pos)
+        pos = _WS.match(text, pos).end()
+        if text[pos:pos + 1] == ',':
+            pos = _WS.match(text, pos + 1).end()
+    return None
+
+
+_INDEX_CACHE = {}  # realpath -> (stamp, BatchIndex or None when the file has no batch_data)
+_INDEX_LOCK = threading.Lock()
+
+
+def get_batch_index(real_path, stamp):
+    """Returns the up-to-date BatchIndex for a file, loading or rebuilding the sidecar as needed."""
+    with _INDEX_LOCK:
+        cached = _INDEX_CACHE.get(real_path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    sidecar = real_path + ".idx"
+    index = None
+    try:
+        with open(sidecar, 'rb') as f:
+            index = BatchIndex.from_dict(loads(f.read()))
+        if index.stamp != stamp:
+            index = None
+    except (OSError, ValueError, KeyError, TypeError):
+        index = None
+
+    if index is None:
+        try:
+            t0 = time.perf_counter()
+            with locked(real_path), open(real_path, 'rb') as f:
+                stamp = fd_stamp(f)
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    scanned = _scan_batch_offsets(mm[:].decode('latin-1'))
+            STATS.count_parse(stamp[1], time.perf_counter() - t0)
+        except (OSError, ValueError) as e:
+            STATS.count("errors")
+            print(f"[JSON Loader] Index Error: {e}")
+            scanned = None
+        if scanned is not None:
+            index = BatchIndex(stamp, *scanned)
+            try:
+                atomic_write(sidecar, dumps(index.to_dict(), pretty=False), lock=False)
+            except OSError:
+                pass  # read-only share: keep the index in memory only
+
+    with _INDEX_LOCK:
+        _INDEX_CACHE[real_path] = (stamp, index)
+    return index
+
+
+def read_indexed_item(real_path, index, pos):
+    """
+    Decodes a single batch_data element straight out of the mmapped file.
+    Returns None if the file was replaced after it was indexed (callers then parse it whole).
+    """
+    key = f"{real_path}#{pos}"
+    item = _DOC_CACHE.get(key, index.stamp)
+    if item is not None:
+        STATS.count("cache_hits")
+        return item
+    STATS.count("cache_misses")
+    start, end = index.offsets[2 * pos], index.offsets[2 * pos + 1]
+    t0 = time.perf_counter()
+    with locked(real_path), open(real_path, 'rb') as f:
+        if fd_stamp(f) != index.stamp:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            item = freeze(loads(mm[start:end]))
+    STATS.count_parse(end - start, time.perf_counter() - t0)
+    _DOC_CACHE.put(key, index.stamp, end - start, item)
+    return item
+
+
+# ==========================================
+# 0d. JSON LINES BATCHES (One Sequence per Line)
+# ==========================================
+
+# A .jsonl batch holds one sequence object per line; the editor appends a line per new
+# sequence and keeps every other key in a <name>.jsonl.meta.json sidecar the nodes never read.
+_SEQ_FIELD = re.compile(rb'"sequence_number"\s*:\s*(-?\d+)')
+
+
+def is_jsonl(json_path):
+    path = urllib.parse.urlsplit(json_path).path if is_url(json_path) else json_path
+    return path.lower().endswith(".jsonl")
+
+
+def parse_jsonl(raw):
+    """Parses a whole .jsonl body into the batch document shape ({} when it has no lines)."""
+    batch = [loads(line) for line in raw.splitlines() if line.strip()]
+    return {"batch_data": batch} if batch else {}
+
+
+def _line_sequence_key(mm, pos, end):
+    """
+    sequence_key of one line. The regex answers for flat objects (a single '{') with one integer
+    "sequence_number"; anything else (string values, nested objects) is parsed to apply the same
+    rule as build_sequence_map.
+    """
+    match = _SEQ_FIELD.search(mm, pos, end)
+    if match and mm.find(b'"sequence_number"', match.end(), end) < 0:
+        first_brace = mm.find(b"{", pos, end)
+        if mm.find(b"{", first_brace + 1, end) < 0:
+            return str(int(match.group(1)))
+    if mm.find(b'"sequence_number"', pos, end) < 0:
+        return None
+    try:
+        return sequence_key(loads(mm[pos:end]))
+    except ValueError:
+        return None
+
+
+def _scan_lines(mm):
+    """Returns (offsets, by_sequence) for every non-blank line of a mmapped .jsonl file."""
+    offsets, by_sequence = [], {}
+    pos, size = 0, len(mm)
+    while pos < size:
+        end = mm.find(b"\n", pos)
+        if end < 0:
+            end = size
+        if mm[pos:end].strip():
+            key = _line_sequence_key(mm, pos, end)
+            if key is not None:
+                by_sequence.setdefault(key, len(offsets) // 2)
+            offsets += [pos, end]
+        pos = end + 1
+    return offsets, by_sequence
+
+
+def get_line_index(real_path, stamp):
+    """
+    Line-offset table of a .jsonl batch, cached per (mtime, size). A scan is a newline search
+    over the mmapped file, so it is rebuilt in memory rather than persisted like the .idx sidecar.
+    """
+    with _INDEX_LOCK:
+        cached = _INDEX_CACHE.get(real_path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    index = BatchIndex(stamp, [], {})
+    if stamp[1]:
+        try:
+            t0 = time.perf_counter()
+            with locked(real_path), open(real_path, 'rb') as f:
+                stamp = fd_stamp(f)
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    index = BatchIndex(stamp, *_scan_lines(mm))
+            STATS.count_parse(stamp[1], time.perf_counter() - t0)
+        except (OSError, ValueError) as e:
+            STATS.count("errors")
+            print(f"[JSON Loader] Index Error: {e}")
+
+    with _INDEX_LOCK:
+        _INDEX_CACHE[real_path] = (stamp, index)
+    return index
+
+
+def indexed_source(json_path):
+    """
+    (real_path, stamp, index) when sequences can be decoded one at a time: every local .jsonl
+    file, and uncompressed .json batches of at least INDEX_MIN_BYTES with no pending edit
+    journal. None means parse the whole document.
+    """
+    if is_jsonl(json_path):
+        source = stat_source(json_path)
+        if source is None:
+            return None
+        return (*source, get_line_index(*source))
+    if INDEX_MIN_BYTES and compression_for(json_path) is None:
+        source = stat_source(json_path)
+        # a stamp longer than (mtime_ns, size) carries a pending journal (see source_stamp)
+        if source is not None and len(source[1]) == 2 and source[1][1] >= INDEX_MIN_BYTES:
+            index = get_batch_index(*source)
+            if index is not None and len(index) > 0:
+                return (*source, index)
+    return None
+
+
+# ==========================================
+# 0e. SHARDED BATCHES (Manifest + Shard Files)
+# ==========================================
+
+# A sharded batch file holds no batch_data itself, only a manifest:
+#   {"batch_manifest": {"shard_size": K, "count": N, "shards": ["x.json.shards/00000.json", ...],
+#                       "sequence_numbers": [...]}, ...}
+# Shard paths are relative to the manifest; each shard is {"batch_data": [<= K sequences]}.
+# sequence_numbers holds sequence_key() of each item (null when it has none).
+MANIFEST_KEY = "batch_manifest"
+
+
+def memoized(obj, name, build):
+    """Caches a derived value on a frozen (cached, immutable) dict/list; plain containers just rebuild."""
+    if isinstance(obj, (FrozenDict, FrozenList)):
+        value = obj.__dict__.get(name)
+        if value is None:
+            value = obj.__dict__[name] = build()
+        return value
+    return build()
+
+
+def get_manifest(data):
+    manifest = data.get(MANIFEST_KEY)
+    if isinstance(manifest, dict) and isinstance(manifest.get("shards"), list):
+        return manifest
+    return None
+
+
+def shard_location(json_path, name):
+    if is_url(json_path):
+        return urllib.parse.urljoin(json_path, name)
+    return os.path.join(os.path.dirname(json_path), name)
+
+
+def read_shard_items(json_path, manifest, positions):
+    """Yields the sequences at the given positions, reading each needed shard once."""
+    size = max(int(manifest.get("shard_size", 1)), 1)
+    shards = manifest["shards"]
+    loaded = {}
+    for pos in positions:
+        shard_no = pos // size
+        if shard_no >= len(shards):
+            yield _EMPTY
+            continue
+        if shard_no not in loaded:
+            shard = read_json_data(shard_location(json_path, shards[shard_no]))
+            loaded[shard_no] = shard.get("batch_data") or []
+        batch = loaded[shard_no]
+        offset = pos % size
+        yield batch[offset] if offset < len(batch) else _EMPTY
+
+
+def manifest_position(manifest, sequence_number, sequence_lookup):
+    count = int(manifest.get("count", 0))
+    if sequence_lookup == "sequence_number":
+        positions = memoized(
+            manifest, "_positions",
+            lambda: build_sequence_map({"sequence_number": n} for n in manifest.get("sequence_numbers") or [])
+        )
+        return positions.get(str(sequence_number))
+    return (sequence_number - 1) % count
+
+
+# ==========================================
+# 0f. SEQUENCE ACCESS
+# ==========================================
+
+def get_batch_item(data, sequence_number, sequence_lookup="position", warn=True):
+    """Picks the sequence out of a batch file; single files are returned as-is."""
+    batch = data.get("batch_data")
+    if isinstance(batch, BATCH_TYPES) and len(batch) > 0:
+        if sequence_lookup == "sequence_number":
+            seq_map = batch.sequence_map() if hasattr(batch, "sequence_map") else build_sequence_map(batch)
+            pos = seq_map.get(str(sequence_number))
+            if pos is None:
+                if warn:
+                    print(f"[JSON Loader] Warning: No sequence_number {sequence_number} in batch")
+                return _EMPTY
+            return batch[pos]
+        return batch[(sequence_number - 1) % len(batch)]
+    return data
+
+
+def load_sequence(json_path, sequence_number, sequence_lookup="position", warn=True):
+    """
+    Returns the selected sequence (or the whole single file). .jsonl and large batch files go
+    through a line/sidecar index and decode one element; everything else uses the shared
+    document cache.
+    """
+    indexed = indexed_source(json_path)
+    if indexed is not None:
+        real_path, stamp, index = indexed
+        if len(index) == 0:
+            return _EMPTY
+        if sequence_lookup == "sequence_number":
+            pos = index.by_sequence.get(str(sequence_number))
+            if pos is None:
+                if warn:
+                    print(f"[JSON Loader] Warning: No sequence_number {sequence_number} in {json_path}")
+                return _EMPTY
+        else:
+            pos = (sequence_number - 1) % len(index)
+        item = read_indexed_item(real_path, index, pos)
+        if item is not None:
+            return item
+    data = read_json_data(json_path)
+    manifest = get_manifest(data)
+    if manifest is not None and manifest.get("count"):
+        pos = manifest_position(manifest, sequence_number, sequence_lookup)
+        if pos is None:
+            if warn:
+                print(f"[JSON Loader] Warning: No sequence_number {sequence_number} in {json_path}")
+            return _EMPTY
+        return next(read_shard_items(json_path, manifest, [pos]))
+    return get_batch_item(data, sequence_number, sequence_lookup, warn)
+
+
+_PREFETCH_POOL = None
+_PREFETCH_PENDING = set()
+_PREFETCH_LOCK = threading.Lock()
+
+
+def _prefetch(key):
+    try:
+        load_sequence(*key, warn=False)
+        STATS.count("prefetches")
+    except Exception as e:
+        print(f"[JSON Loader] Prefetch Error: {e}")
+    finally:
+        with _PREFETCH_LOCK:
+            _PREFETCH_PENDING.discard(key)
+
+
+def schedule_prefetch(json_path, sequence_number, sequence_lookup="position"):
+    """
+    Queues a background load of the given sequence (no-op unless PREFETCH_NEXT). The load
+    re-stats the file, re-parses or re-indexes it if it changed, and decodes the sequence
+    into the shared cache. A single worker thread keeps disk access serialized.
+    """
+    global _PREFETCH_POOL
+    if not PREFETCH_NEXT:
+        return
+    key = (json_path, sequence_number, sequence_lookup)
+    with _PREFETCH_LOCK:
+        if key in _PREFETCH_PENDING:
+            return
+        _PREFETCH_PENDING.add(key)
+        if _PREFETCH_POOL is None:
+            _PREFETCH_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="json-loader-prefetch")
+    _PREFETCH_POOL.submit(_prefetch, key)
+
+def get_batch_slice(data, start, count):
+    """Returns sequences start..start+count-1 (1-based, count 0 = to the end) of a batch file."""
+    batch = data.get("batch_data")
+    if not isinstance(batch, BATCH_TYPES) or len(batch) == 0:
+        return [data]
+    begin = max(start - 1, 0)
+    end = len(batch) if count <= 0 else begin + count
+    return batch[begin:end]
+
+def load_slice(json_path, start, count):
+    """get_batch_slice for a path; indexed and sharded batches only decode what the slice touches."""
+    indexed = indexed_source(json_path)
+    if indexed is not None:
+        real_path, stamp, index = indexed
+        begin = max(start - 1, 0)
+        end = len(index) if count <= 0 else min(begin + count, len(index))
+        items = [read_indexed_item(real_path, index, pos) for pos in range(begin, end)]
+        if all(item is not None for item in items):
+            return items
+    data = read_json_data(json_path)
+    manifest = get_manifest(data)
+    if manifest is not None and manifest.get("count"):
+        total = int(manifest["count"])
+        begin = max(start - 1, 0)
+        end = total if count <= 0 else min(begin + count, total)
+        return list(read_shard_items(json_path, manifest, range(begin, end)))
+    return get_batch_slice(data, start, count)
+
+def content_fingerprint(json_path, sequence_number=None, keys=None, sequence_lookup="position"):
+    """
+    IS_CHANGED helper. The file's mtime/size only decide whether the cached parse is reused;
+    the fingerprint itself hashes just the selected sequence (and keys), so edits elsewhere
+    in the file do not re-run nodes that read something else.
+    """
+    if sequence_number is None:
+        target = read_json_data(json_path)
+    else:
+        target = load_sequence(json_path, sequence_number, sequence_lookup)
+    if not target:
+        return "missing"
+    if keys is not None:
+        target = [lookup_path(target, k, None) for k in keys]
+    payload = json.dumps(target, sort_keys=True, default=json_default)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def slice_fingerprint(json_path, start, count, keys):
+    """IS_CHANGED helper for the list nodes: hashes the selected keys of every sequence in the slice."""
+    # indexed files are known to exist; only the others need (and reuse) the cached parse
+    if indexed_source(json_path) is None and not read_json_data(json_path):
+        return "missing"
+    target = [[item.get(k) for k in keys] for item in load_slice(json_path, start, count)]
+    payload = json.dumps(target, sort_keys=True, default=json_default)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+# ==========================================
+# 0g. FIELD SCHEMA & COMPILED EXTRACTORS
+# ==========================================
+
+def to_string(val):
+    if isinstance(val, (dict, list)):
+        return json.dumps(val)
+    return str(val)
+
+def to_float(val):
+    try: return float(val)
+    except (TypeError, ValueError): return 0.0
+
+def to_int(val):
+    if isinstance(val, int) and not isinstance(val, bool):
+        return val
+    try: return int(float(val))
+    except (TypeError, ValueError, OverflowError): return 0
+
+def to_bool(val):
+    if isinstance(val, str):
+        return val.strip().lower() in ("1", "true", "yes", "on")
+    return bool(val)
+
+# Output type -> (coercion, value used when the key is missing)
+COERCERS = {
+    "STRING": (to_string, ""),
+    "INT": (to_int, 0),
+    "FLOAT": (to_float, 0.0),
+    "BOOLEAN": (to_bool, False),
+}
+
+# Output name -> (JSON key, output type, default when missing)
+FIELD_SCHEMA = {
+    "general_prompt": ("general_prompt", "STRING", ""),
+    "general_negative": ("general_negative", "STRING", ""),
+    "current_prompt": ("current_prompt", "STRING", ""),
+    "negative": ("negative", "STRING", ""),
+    "camera": ("camera", "STRING", ""),
+    "flf": ("flf", "FLOAT", 0.0),
+    "seed": ("seed", "INT", 0),
+    "frame_to_skip": ("frame_to_skip", "INT", 81),
+    "input_a_frames": ("input_a_frames", "INT", 0),
+    "input_b_frames": ("input_b_frames", "INT", 0),
+    "reference_path": ("reference path", "STRING", ""),
+    "reference_switch": ("reference switch", "INT", 1),
+    "vace_schedule": ("vace schedule", "INT", 1),
+    "video_file_path": ("video file path", "STRING", ""),
+    "reference_image_path": ("reference image path", "STRING", ""),
+    "flf_image_path": ("flf image path", "STRING", ""),
+    "lora_1_high": ("lora 1 high", "STRING", ""), "lora_1_low": ("lora 1 low", "STRING", ""),
+    "lora_2_high": ("lora 2 high", "STRING", ""), "lora_2_low": ("lora 2 low", "STRING", ""),
+    "lora_3_high": ("lora 3 high", "STRING", ""), "lora_3_low": ("lora 3 low", "STRING", ""),
+}
+
+# key, .key, [index] or ["quoted key"] -- e.g. loras.high[0].name or settings["v1.5"].strength
+_PATH_TOKEN = re.compile(r'\.?([^.\[\]"\']+)|\[(-?\d+)\]|\[(["\'])(.*?)\3\]')
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_key_path(path):
+    """Splits a key path into dict keys (str) and list indices (int); parsed once per distinct path."""
+    steps, pos = [], 0
+    while pos < len(path):
+        m = _PATH_TOKEN.match(path, pos)
+        if m is None:
+            return (path,)  # not a valid path: treat the whole thing as a plain key
+        if m.group(1) is not None:
+            steps.append(m.group(1))
+        elif m.group(2) is not None:
+            steps.append(int(m.group(2)))
+        else:
+            steps.append(m.group(4))
+        pos = m.end()
+    return tuple(steps) or (path,)
+
+
+def lookup_path(target, path, default=""):
+    """
+    Reads a flat key or a nested path out of a sequence. An exact top-level key always wins,
+    so existing keys containing dots or brackets keep working.
+    """
+    if path in target:
+        return target[path]
+    steps = compile_key_path(path)
+    if len(steps) == 1:
+        return default
+    cur = target
+    for step in steps:
+        if isinstance(step, int):
+            if not isinstance(cur, BATCH_TYPES) or not -len(cur) <= step < len(cur):
+                return default
+        elif not isinstance(cur, dict) or step not in cur:
+            return default
+        cur = cur[step]
+    return cur
+
+
+LORA_OUTPUTS = ("lora_1_high", "lora_1_low", "lora_2_high", "lora_2_low", "lora_3_high", "lora_3_low")
+I2V_OUTPUTS = ("general_prompt", "general_negative", "current_prompt", "negative", "camera", "flf", "seed", "video_file_path", "reference_image_path", "flf_image_path")
+VACE_OUTPUTS = ("general_prompt", "general_negative", "current_prompt", "negative", "camera", "flf", "seed", "frame_to_skip", "input_a_frames", "input_b_frames", "reference_path", "reference_switch", "vace_schedule", "video_file_path", "reference_image_path")
+
+
+class FieldSet:
+    """
+    A node's output layout, compiled once at import into a (key, default, coercion) table
+    so each call is a single tuple-building pass over the target dict.
+    """
+    def __init__(self, names):
+        self.names = tuple(names)
+        self.types = tuple(FIELD_SCHEMA[n][1] for n in self.names)
+        self.keys = tuple(FIELD_SCHEMA[n][0] for n in self.names)
+        self.table = tuple(
+            (FIELD_SCHEMA[n][0], FIELD_SCHEMA[n][2], COERCERS[FIELD_SCHEMA[n][1]][0]) for n in self.names
+        )
+
+    def extract(self, target):
+        get = target.get
+        return tuple([coerce(get(key, default)) for key, default, coerce in self.table])
+
+
+LORA_FIELDS = FieldSet(LORA_OUTPUTS)
+I2V_FIELDS = FieldSet(I2V_OUTPUTS)
+VACE_FIELDS = FieldSet(VACE_OUTPUTS)
 
 # ==========================================
 # 1. STANDARD NODES (Single File)
@@ -22,75 +1222,54 @@ class JSONLoaderLoRA:
     def INPUT_TYPES(s):
         return {"required": {"json_path": ("STRING", {"default": "", "multiline": False})}}
 
-    RETURN_TYPES = ("STRING", "STRING", "STRING", "STRING", "STRING", "STRING")
-    RETURN_NAMES = ("lora_1_high", "lora_1_low", "lora_2_high", "lora_2_low", "lora_3_high", "lora_3_low")
+    RETURN_TYPES = LORA_FIELDS.types
+    RETURN_NAMES = LORA_FIELDS.names
     FUNCTION = "load_loras"
     CATEGORY = "utils/json"
+    JSON_KEYS = LORA_FIELDS.keys
+
+    @classmethod
+    def IS_CHANGED(s, json_path):
+        return content_fingerprint(json_path, keys=s.JSON_KEYS)
 
     def load_loras(self, json_path):
-        data = read_json_data(json_path)
-        return (
-            str(data.get("lora 1 high", "")), str(data.get("lora 1 low", "")),
-            str(data.get("lora 2 high", "")), str(data.get("lora 2 low", "")),
-            str(data.get("lora 3 high", "")), str(data.get("lora 3 low", ""))
-        )
+        return LORA_FIELDS.extract(read_json_data(json_path))
 
 class JSONLoaderStandard:
     @classmethod
     def INPUT_TYPES(s):
         return {"required": {"json_path": ("STRING", {"default": "", "multiline": False})}}
 
-    RETURN_TYPES = ("STRING", "STRING", "STRING", "STRING", "STRING", "FLOAT", "INT", "STRING", "STRING", "STRING")
-    RETURN_NAMES = ("general_prompt", "general_negative", "current_prompt", "negative", "camera", "flf", "seed", "video_file_path", "reference_image_path", "flf_image_path")
+    RETURN_TYPES = I2V_FIELDS.types
+    RETURN_NAMES = I2V_FIELDS.names
     FUNCTION = "load_standard"
     CATEGORY = "utils/json"
+    JSON_KEYS = I2V_FIELDS.keys
 
-    def load_standard(self, json_path):
-        data = read_json_data(json_path)
-        def to_float(val):
-            try: return float(val)
-            except: return 0.0
-        def to_int(val):
-            try: return int(float(val))
-            except: return 0
+    @classmethod
+    def IS_CHANGED(s, json_path):
+        return content_fingerprint(json_path, keys=s.JSON_KEYS)
 
-        return (
-            str(data.get("general_prompt", "")), str(data.get("general_negative", "")),
-            str(data.get("current_prompt", "")), str(data.get("negative", "")),
-            str(data.get("camera", "")), to_float(data.get("flf", 0.0)),
-            to_int(data.get("seed", 0)), str(data.get("video file path", "")),
-            str(data.get("reference image path", "")), str(data.get("flf image path", ""))
-        )
+    def load_standard(self, json_path):
+        return I2V_FIELDS.extract(read_json_data(json_path))
 
 class JSONLoaderVACE:
     @classmethod
     def INPUT_TYPES(s):
         return {"required": {"json_path": ("STRING", {"default": "", "multiline": False})}}
 
-    RETURN_TYPES = ("STRING", "STRING", "STRING", "STRING", "STRING", "FLOAT", "INT", "INT", "INT", "INT", "STRING", "INT", "INT", "STRING", "STRING")
-    RETURN_NAMES = ("general_prompt", "general_negative", "current_prompt", "negative", "camera", "flf", "seed", "frame_to_skip", "input_a_frames", "input_b_frames", "reference_path", "reference_switch", "vace_schedule", "video_file_path", "reference_image_path")
+    RETURN_TYPES = VACE_FIELDS.types
+    RETURN_NAMES = VACE_FIELDS.names
     FUNCTION = "load_vace"
     CATEGORY = "utils/json"
+    JSON_KEYS = VACE_FIELDS.keys
 
-    def load_vace(self, json_path):
-        data = read_json_data(json_path)
-        def to_float(val):
-            try: return float(val)
-            except: return 0.0
-        def to_int(val):
-            try: return int(float(val))
-            except: return 0
+    @classmethod
+    def IS_CHANGED(s, json_path):
+        return content_fingerprint(json_path, keys=s.JSON_KEYS)
 
-        return (
-            str(data.get("general_prompt", "")), str(data.get("general_negative", "")),
-            str(data.get("current_prompt", "")), str(data.get("negative", "")),
-            str(data.get("camera", "")), to_float(data.get("flf", 0.0)),
-            to_int(data.get("seed", 0)),
-            to_int(data.get("frame_to_skip", 81)), to_int(data.get("input_a_frames", 0)),
-            to_int(data.get("input_b_frames", 0)), str(data.get("reference path", "")),
-            to_int(data.get("reference switch", 1)), to_int(data.get("vace schedule", 1)),
-            str(data.get("video file path", "")), str(data.get("reference image path", ""))
-        )
+    def load_vace(self, json_path):
+        return VACE_FIELDS.extract(read_json_data(json_path))
 
 # ==========================================
 # 2. BATCH NODES
@@ -99,84 +1278,110 @@ class JSONLoaderVACE:
 class JSONLoaderBatchLoRA:
     @classmethod
     def INPUT_TYPES(s):
-        return {"required": {"json_path": ("STRING", {"default": "", "multiline": False}), "sequence_number": ("INT", {"default": 1, "min": 1, "max": 9999})}}
-    RETURN_TYPES = ("STRING", "STRING", "STRING", "STRING", "STRING", "STRING")
-    RETURN_NAMES = ("lora_1_high", "lora_1_low", "lora_2_high", "lora_2_low", "lora_3_high", "lora_3_low")
+        return {
+            "required": {"json_path": ("STRING", {"default": "", "multiline": False}), "sequence_number": ("INT", {"default": 1, "min": 1, "max": 9999})},
+            "optional": {"sequence_lookup": (SEQUENCE_LOOKUPS,)}
+        }
+    RETURN_TYPES = LORA_FIELDS.types
+    RETURN_NAMES = LORA_FIELDS.names
     FUNCTION = "load_batch_loras"
     CATEGORY = "utils/json"
+    JSON_KEYS = LORA_FIELDS.keys
+    extract = staticmethod(LORA_FIELDS.extract)
 
-    def load_batch_loras(self, json_path, sequence_number):
-        data = read_json_data(json_path)
-        target_data = data
-        if "batch_data" in data and isinstance(data["batch_data"], list) and len(data["batch_data"]) > 0:
-            idx = (sequence_number - 1) % len(data["batch_data"])
-            target_data = data["batch_data"][idx]
-        return (
-            str(target_data.get("lora 1 high", "")), str(target_data.get("lora 1 low", "")),
-            str(target_data.get("lora 2 high", "")), str(target_data.get("lora 2 low", "")),
-            str(target_data.get("lora 3 high", "")), str(target_data.get("lora 3 low", ""))
-        )
+    @classmethod
+    def IS_CHANGED(s, json_path, sequence_number, sequence_lookup="position"):
+        return content_fingerprint(json_path, sequence_number, s.JSON_KEYS, sequence_lookup)
+
+    def load_batch_loras(self, json_path, sequence_number, sequence_lookup="position"):
+        target_data = load_sequence(json_path, sequence_number, sequence_lookup)
+        schedule_prefetch(json_path, sequence_number + 1, sequence_lookup)
+        return self.extract(target_data)
 
 class JSONLoaderBatchI2V:
     @classmethod
     def INPUT_TYPES(s):
-        return {"required": {"json_path": ("STRING", {"default": "", "multiline": False}), "sequence_number": ("INT", {"default": 1, "min": 1, "max": 9999})}}
-    RETURN_TYPES = ("STRING", "STRING", "STRING", "STRING", "STRING", "FLOAT", "INT", "STRING", "STRING", "STRING")
-    RETURN_NAMES = ("general_prompt", "general_negative", "current_prompt", "negative", "camera", "flf", "seed", "video_file_path", "reference_image_path", "flf_image_path")
+        return {
+            "required": {"json_path": ("STRING", {"default": "", "multiline": False}), "sequence_number": ("INT", {"default": 1, "min": 1, "max": 9999})},
+            "optional": {"sequence_lookup": (SEQUENCE_LOOKUPS,)}
+        }
+    RETURN_TYPES = I2V_FIELDS.types
+    RETURN_NAMES = I2V_FIELDS.names
     FUNCTION = "load_batch_i2v"
     CATEGORY = "utils/json"
+    JSON_KEYS = I2V_FIELDS.keys
+    extract = staticmethod(I2V_FIELDS.extract)
 
-    def load_batch_i2v(self, json_path, sequence_number):
-        data = read_json_data(json_path)
-        target_data = data
-        if "batch_data" in data and isinstance(data["batch_data"], list) and len(data["batch_data"]) > 0:
-            idx = (sequence_number - 1) % len(data["batch_data"])
-            target_data = data["batch_data"][idx]
-        def to_float(val):
-            try: return float(val)
-            except: return 0.0
-        def to_int(val):
-            try: return int(float(val))
-            except: return 0
-        return (
-            str(target_data.get("general_prompt", "")), str(target_data.get("general_negative", "")),
-            str(target_data.get("current_prompt", "")), str(target_data.get("negative", "")),
-            str(target_data.get("camera", "")), to_float(target_data.get("flf", 0.0)),
-            to_int(target_data.get("seed", 0)), str(target_data.get("video file path", "")),
-            str(target_data.get("reference image path", "")), str(target_data.get("flf image path", ""))
-        )
+    @classmethod
+    def IS_CHANGED(s, json_path, sequence_number, sequence_lookup="position"):
+        return content_fingerprint(json_path, sequence_number, s.JSON_KEYS, sequence_lookup)
+
+    def load_batch_i2v(self, json_path, sequence_number, sequence_lookup="position"):
+        target_data = load_sequence(json_path, sequence_number, sequence_lookup)
+        schedule_prefetch(json_path, sequence_number + 1, sequence_lookup)
+        return self.extract(target_data)
 
 class JSONLoaderBatchVACE:
     @classmethod
     def INPUT_TYPES(s):
-        return {"required": {"json_path": ("STRING", {"default": "", "multiline": False}), "sequence_number": ("INT", {"default": 1, "min": 1, "max": 9999})}}
-    RETURN_TYPES = ("STRING", "STRING", "STRING", "STRING", "STRING", "FLOAT", "INT", "INT", "INT", "INT", "STRING", "INT", "INT", "STRING", "STRING")
-    RETURN_NAMES = ("general_prompt", "general_negative", "current_prompt", "negative", "camera", "flf", "seed", "frame_to_skip", "input_a_frames", "input_b_frames", "reference_path", "reference_switch", "vace_schedule", "video_file_path", "reference_image_path")
+        return {
+            "required": {"json_path": ("STRING", {"default": "", "multiline": False}), "sequence_number": ("INT", {"default": 1, "min": 1, "max": 9999})},
+            "optional": {"sequence_lookup": (SEQUENCE_LOOKUPS,)}
+        }
+    RETURN_TYPES = VACE_FIELDS.types
+    RETURN_NAMES = VACE_FIELDS.names
     FUNCTION = "load_batch_vace"
     CATEGORY = "utils/json"
+    JSON_KEYS = VACE_FIELDS.keys
+    extract = staticmethod(VACE_FIELDS.extract)
 
-    def load_batch_vace(self, json_path, sequence_number):
-        data = read_json_data(json_path)
-        target_data = data
-        if "batch_data" in data and isinstance(data["batch_data"], list) and len(data["batch_data"]) > 0:
-            idx = (sequence_number - 1) % len(data["batch_data"])
-            target_data = data["batch_data"][idx]
-        def to_float(val):
-            try: return float(val)
-            except: return 0.0
-        def to_int(val):
-            try: return int(float(val))
-            except: return 0
-        return (
-            str(target_data.get("general_prompt", "")), str(target_data.get("general_negative", "")),
-            str(target_data.get("current_prompt", "")), str(target_data.get("negative", "")),
-            str(target_data.get("camera", "")), to_float(target_data.get("flf", 0.0)),
-            to_int(target_data.get("seed", 0)), to_int(target_data.get("frame_to_skip", 81)),
-            to_int(target_data.get("input_a_frames", 0)), to_int(target_data.get("input_b_frames", 0)),
-            str(target_data.get("reference path", "")), to_int(target_data.get("reference switch", 1)),
-            to_int(target_data.get("vace schedule", 1)), str(target_data.get("video file path", "")),
-            str(target_data.get("reference image path", ""))
-        )
+    @classmethod
+    def IS_CHANGED(s, json_path, sequence_number, sequence_lookup="position"):
+        return content_fingerprint(json_path, sequence_number, s.JSON_KEYS, sequence_lookup)
+
+    def load_batch_vace(self, json_path, sequence_number, sequence_lookup="position"):
+        target_data = load_sequence(json_path, sequence_number, sequence_lookup)
+        schedule_prefetch(json_path, sequence_number + 1, sequence_lookup)
+        return self.extract(target_data)
+
+# ==========================================
+# 2b. BATCH LIST NODES (All Sequences, One Parse)
+# ==========================================
+
+class BatchListMixin:
+    """
+    Emits every sequence of the slice as list outputs, so ComfyUI fans the graph out itself
+    instead of needing one queued prompt (and one file read) per sequence.
+    """
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "json_path": ("STRING", {"default": "", "multiline": False}),
+                "start": ("INT", {"default": 1, "min": 1, "max": 99999}),
+                "count": ("INT", {"default": 0, "min": 0, "max": 99999}),
+            }
+        }
+    FUNCTION = "load_batch_list"
+
+    @classmethod
+    def IS_CHANGED(s, json_path, start, count):
+        return slice_fingerprint(json_path, start, count, s.JSON_KEYS)
+
+    def load_batch_list(self, json_path, start, count):
+        rows = [self.extract(item) for item in load_slice(json_path, start, count)]
+        if not rows:
+            return tuple([] for _ in self.RETURN_TYPES)
+        return tuple(list(col) for col in zip(*rows))
+
+class JSONLoaderBatchLoRAList(BatchListMixin, JSONLoaderBatchLoRA):
+    OUTPUT_IS_LIST = (True,) * len(JSONLoaderBatchLoRA.RETURN_TYPES)
+
+class JSONLoaderBatchI2VList(BatchListMixin, JSONLoaderBatchI2V):
+    OUTPUT_IS_LIST = (True,) * len(JSONLoaderBatchI2V.RETURN_TYPES)
+
+class JSONLoaderBatchVACEList(BatchListMixin, JSONLoaderBatchVACE):
+    OUTPUT_IS_LIST = (True,) * len(JSONLoaderBatchVACE.RETURN_TYPES)
 
 # ==========================================
 # 3. UNIVERSAL CUSTOM NODES (1, 3, 6 Slots)
@@ -190,20 +1395,23 @@ class JSONLoaderCustom1:
                 "json_path": ("STRING", {"default": "", "multiline": False}),
                 "sequence_number": ("INT", {"default": 1, "min": 1, "max": 9999}),
             },
-            "optional": { "key_1": ("STRING", {"default": "", "multiline": False}) }
+            "optional": {
+                "key_1": ("STRING", {"default": "", "multiline": False}),
+                "sequence_lookup": (SEQUENCE_LOOKUPS,)
+            }
         }
     RETURN_TYPES = ("STRING",)
     RETURN_NAMES = ("val_1",)
     FUNCTION = "load_custom"
     CATEGORY = "utils/json"
 
-    def load_custom(self, json_path, sequence_number, key_1=""):
-        data = read_json_data(json_path)
-        target_data = data
-        if "batch_data" in data and isinstance(data["batch_data"], list) and len(data["batch_data"]) > 0:
-            idx = (sequence_number - 1) % len(data["batch_data"])
-            target_data = data["batch_data"][idx]
-        return (str(target_data.get(key_1, "")),)
+    @classmethod
+    def IS_CHANGED(s, json_path, sequence_number, key_1="", sequence_lookup="position"):
+        return content_fingerprint(json_path, sequence_number, (key_1,), sequence_lookup)
+
+    def load_custom(self, json_path, sequence_number, key_1="", sequence_lookup="position"):
+        target_data = load_sequence(json_path, sequence_number, sequence_lookup)
+        return (to_string(lookup_path(target_data, key_1)),)
 
 class JSONLoaderCustom3:
     @classmethod
@@ -216,7 +1424,8 @@ class JSONLoaderCustom3:
             "optional": {
                 "key_1": ("STRING", {"default": "", "multiline": False}),
                 "key_2": ("STRING", {"default": "", "multiline": False}),
-                "key_3": ("STRING", {"default": "", "multiline": False})
+                "key_3": ("STRING", {"default": "", "multiline": False}),
+                "sequence_lookup": (SEQUENCE_LOOKUPS,)
             }
         }
     RETURN_TYPES = ("STRING", "STRING", "STRING")
@@ -224,16 +1433,16 @@ class JSONLoaderCustom3:
     FUNCTION = "load_custom"
     CATEGORY = "utils/json"
 
-    def load_custom(self, json_path, sequence_number, key_1="", key_2="", key_3=""):
-        data = read_json_data(json_path)
-        target_data = data
-        if "batch_data" in data and isinstance(data["batch_data"], list) and len(data["batch_data"]) > 0:
-            idx = (sequence_number - 1) % len(data["batch_data"])
-            target_data = data["batch_data"][idx]
+    @classmethod
+    def IS_CHANGED(s, json_path, sequence_number, key_1="", key_2="", key_3="", sequence_lookup="position"):
+        return content_fingerprint(json_path, sequence_number, (key_1, key_2, key_3), sequence_lookup)
+
+    def load_custom(self, json_path, sequence_number, key_1="", key_2="", key_3="", sequence_lookup="position"):
+        target_data = load_sequence(json_path, sequence_number, sequence_lookup)
         return (
-            str(target_data.get(key_1, "")),
-            str(target_data.get(key_2, "")),
-            str(target_data.get(key_3, ""))
+            to_string(lookup_path(target_data, key_1)),
+            to_string(lookup_path(target_data, key_2)),
+            to_string(lookup_path(target_data, key_3))
         )
 
 class JSONLoaderCustom6:
@@ -250,7 +1459,8 @@ class JSONLoaderCustom6:
                 "key_3": ("STRING", {"default": "", "multiline": False}),
                 "key_4": ("STRING", {"default": "", "multiline": False}),
                 "key_5": ("STRING", {"default": "", "multiline": False}),
-                "key_6": ("STRING", {"default": "", "multiline": False})
+                "key_6": ("STRING", {"default": "", "multiline": False}),
+                "sequence_lookup": (SEQUENCE_LOOKUPS,)
             }
         }
     RETURN_TYPES = ("STRING", "STRING", "STRING", "STRING", "STRING", "STRING")
@@ -258,18 +1468,271 @@ class JSONLoaderCustom6:
     FUNCTION = "load_custom"
     CATEGORY = "utils/json"
 
-    def load_custom(self, json_path, sequence_number, key_1="", key_2="", key_3="", key_4="", key_5="", key_6=""):
-        data = read_json_data(json_path)
-        target_data = data
-        if "batch_data" in data and isinstance(data["batch_data"], list) and len(data["batch_data"]) > 0:
-            idx = (sequence_number - 1) % len(data["batch_data"])
-            target_data = data["batch_data"][idx]
+    @classmethod
+    def IS_CHANGED(s, json_path, sequence_number, key_1="", key_2="", key_3="", key_4="", key_5="", key_6="", sequence_lookup="position"):
+        return content_fingerprint(json_path, sequence_number, (key_1, key_2, key_3, key_4, key_5, key_6), sequence_lookup)
+
+    def load_custom(self, json_path, sequence_number, key_1="", key_2="", key_3="", key_4="", key_5="", key_6="", sequence_lookup="position"):
+        target_data = load_sequence(json_path, sequence_number, sequence_lookup)
         return (
-            str(target_data.get(key_1, "")), str(target_data.get(key_2, "")),
-            str(target_data.get(key_3, "")), str(target_data.get(key_4, "")),
-            str(target_data.get(key_5, "")), str(target_data.get(key_6, ""))
+            to_string(lookup_path(target_data, key_1)), to_string(lookup_path(target_data, key_2)),
+            to_string(lookup_path(target_data, key_3)), to_string(lookup_path(target_data, key_4)),
+            to_string(lookup_path(target_data, key_5)), to_string(lookup_path(target_data, key_6))
         )
 
+# ==========================================
+# 4. TYPED CUSTOM NODE (N Slots, Any Output Type)
+# ==========================================
+
+# Number of key slots on the typed custom node.
+CUSTOM_TYPED_SLOTS = 8
+
+
+class AnyType(str):
+    """Socket type that ComfyUI's connection check treats as compatible with anything."""
+    def __ne__(self, other):
+        return False
+
+ANY_TYPE = AnyType("*")
+
+
+@functools.lru_cache(maxsize=256)
+def compile_custom_extractor(keys, types):
+    """Builds (and memoizes) the key/default/coercion table for one slot configuration."""
+    table = tuple((k, COERCERS[t][1], COERCERS[t][0]) for k, t in zip(keys, types))
+    def extract(target):
+        return tuple([coerce(lookup_path(target, key, default)) if key else default for key, default, coerce in table])
+    return extract
+
+
+class JSONLoaderCustomTyped:
+    """Reads N arbitrary keys and coerces each to the type picked next to it (INT/FLOAT/STRING/BOOLEAN)."""
+    @classmethod
+    def INPUT_TYPES(s):
+        optional = {}
+        for i in range(1, CUSTOM_TYPED_SLOTS + 1):
+            optional[f"key_{i}"] = ("STRING", {"default": "", "multiline": False})
+            optional[f"type_{i}"] = (list(COERCERS.keys()),)
+        optional["sequence_lookup"] = (SEQUENCE_LOOKUPS,)
+        return {
+            "required": {
+                "json_path": ("STRING", {"default": "", "multiline": False}),
+                "sequence_number": ("INT", {"default": 1, "min": 1, "max": 9999}),
+            },
+            "optional": optional
+        }
+    RETURN_TYPES = (ANY_TYPE,) * CUSTOM_TYPED_SLOTS
+    RETURN_NAMES = tuple(f"val_{i}" for i in range(1, CUSTOM_TYPED_SLOTS + 1))
+    FUNCTION = "load_custom_typed"
+    CATEGORY = "utils/json"
+
+    @staticmethod
+    def _slots(kwargs):
+        keys = tuple(kwargs.get(f"key_{i}", "") for i in range(1, CUSTOM_TYPED_SLOTS + 1))
+        types = tuple(kwargs.get(f"type_{i}", "STRING") for i in range(1, CUSTOM_TYPED_SLOTS + 1))
+        return keys, types
+
+    @classmethod
+    def IS_CHANGED(s, json_path, sequence_number, sequence_lookup="position", **kwargs):
+        keys, types = s._slots(kwargs)
+        return content_fingerprint(json_path, sequence_number, keys, sequence_lookup) + "|" + ":".join(types)
+
+    def load_custom_typed(self, json_path, sequence_number, sequence_lookup="position", **kwargs):
+        keys, types = self._slots(kwargs)
+        target_data = load_sequence(json_path, sequence_number, sequence_lookup)
+        return compile_custom_extractor(keys, types)(target_data)
+
+# ==========================================
+# 4b. BATCH ITERATOR (Persisted Cursor)
+# ==========================================
+
+_CURSOR_LOCK = threading.Lock()
+
+
+def batch_length(json_path):
+    """Number of sequences in a batch file (1 for a single file, 0 if unreadable)."""
+    indexed = indexed_source(json_path)
+    if indexed is not None:
+        return len(indexed[2])
+    data = read_json_data(json_path)
+    if not data:
+        return 0
+    manifest = get_manifest(data)
+    if manifest is not None and manifest.get("count"):
+        return int(manifest["count"])
+    batch = data.get("batch_data")
+    return len(batch) if isinstance(batch, BATCH_TYPES) and batch else 1
+
+
+def _temp_cursor_path(key):
+    name = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(tempfile.gettempdir(), f"json_loader_{name}.cursor.json")
+
+
+def cursor_path(json_path):
+    if is_url(json_path):
+        # Remote sources have no folder of their own; keep their cursors in the temp dir.
+        return _temp_cursor_path(json_path)
+    return os.path.realpath(json_path) + ".cursor.json"
+
+
+def _cursor_paths(json_path):
+    """The cursor file next to the data, then the temp-dir fallback used when that folder is read-only."""
+    primary = cursor_path(json_path)
+    if is_url(json_path):
+        return [primary]
+    return [primary, _temp_cursor_path(os.path.realpath(json_path))]
+
+
+def read_cursors(json_path):
+    """Cursors from both locations; per workflow the most recently updated one wins."""
+    cursors = {}
+    for path in _cursor_paths(json_path):
+        try:
+            with open(path, 'r') as f:
+                found = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for key, cursor in found.items():
+            if key not in cursors or cursor.get("updated", 0) > cursors[key].get("updated", 0):
+                cursors[key] = cursor
+    return cursors
+
+
+def write_cursors(json_path, cursors):
+    """Raises when no location is writable, so a lost cursor never silently repeats a sequence."""
+    errors = []
+    for path in _cursor_paths(json_path):
+        try:
+            atomic_write(path, json.dumps(cursors, indent=4), lock=False)
+            return path
+        except OSError as e:
+            errors.append(f"{path}: {e}")
+    raise RuntimeError(f"[JSON Loader] Cannot save the batch cursor ({'; '.join(errors)})")
+
+
+class JSONBatchIterator:
+    """
+    Hands out the next sequence_number on every execution and remembers where it stopped
+    in <file>.cursor.json (one cursor per workflow), so "Queue" can simply be pressed N times.
+    """
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "json_path": ("STRING", {"default": "", "multiline": False}),
+                "at_end": (["stop", "wrap"],),
+            },
+            "optional": {
+                "workflow_id": ("STRING", {"default": "", "multiline": False}),
+                "skip_if_exists": ("STRING", {"default": "", "multiline": False}),
+                "reset": ("BOOLEAN", {"default": False}),
+            },
+            "hidden": {"extra_pnginfo": "EXTRA_PNGINFO"},
+        }
+    RETURN_TYPES = ("INT", "BOOLEAN", "INT", "INT")
+    RETURN_NAMES = ("sequence_number", "is_last", "remaining", "total")
+    FUNCTION = "next_sequence"
+    CATEGORY = "utils/json"
+
+    # With skip_if_exists, "remaining" checks at most this many of the following sequences;
+    # ones further ahead are counted as still to do.
+    REMAINING_SCAN_LIMIT = 64
+
+    @classmethod
+    def IS_CHANGED(s, **kwargs):
+        return float("NaN")  # the cursor moves on every run
+
+    @staticmethod
+    def _workflow_key(workflow_id, extra_pnginfo):
+        if workflow_id:
+            return workflow_id
+        if isinstance(extra_pnginfo, dict):
+            workflow = extra_pnginfo.get("workflow")
+            if isinstance(workflow, dict) and workflow.get("id"):
+                return str(workflow["id"])
+        return "default"
+
+    @staticmethod
+    def _already_rendered(json_path, pattern, pos):
+        """skip_if_exists is a glob; {seq} is the stored sequence_number, {index} the 1-based position."""
+        if not pattern:
+            return False
+        item = load_sequence(json_path, pos + 1, warn=False)
+        seq = item.get("sequence_number", pos + 1) if item else pos + 1
+        try:
+            return bool(glob.glob(pattern.format(seq=seq, index=pos + 1)))
+        except (KeyError, IndexError, ValueError) as e:
+            print(f"[JSON Loader] Warning: bad skip_if_exists pattern: {e}")
+            return False
+
+    def next_sequence(self, json_path, at_end, workflow_id="", skip_if_exists="", reset=False, extra_pnginfo=None):
+        total = batch_length(json_path)
+        if total == 0:
+            raise RuntimeError(f"[JSON Loader] Cannot iterate {json_path}: file missing or empty")
+
+        key = self._workflow_key(workflow_id, extra_pnginfo)
+        with _CURSOR_LOCK:
+            cursors = read_cursors(json_path)
+            pos = 0 if reset else int(cursors.get(key, {}).get("next", 0))
+
+            wrapped = False
+            while True:
+                if pos >= total:
+                    if at_end == "wrap" and not wrapped:
+                        pos, wrapped = 0, True
+                    else:
+                        raise RuntimeError(f"[JSON Loader] Batch finished: all {total} sequences of {json_path} are done")
+                if not self._already_rendered(json_path, skip_if_exists, pos):
+                    break
+                pos += 1
+
+            cursors[key] = {"next": pos + 1, "updated": time.time()}
+            write_cursors(json_path, cursors)
+
+        remaining = total - pos - 1
+        if skip_if_exists:
+            ahead = range(pos + 1, min(total, pos + 1 + self.REMAINING_SCAN_LIMIT))
+            remaining -= sum(1 for p in ahead if self._already_rendered(json_path, skip_if_exists, p))
+        return (pos + 1, remaining == 0, remaining, total)
+
+# ==========================================
+# 5. INSTRUMENTATION & SERVER ROUTE
+# ==========================================
+
+def instrument(cls):
+    """Wraps a node's FUNCTION so every execution is counted and timed in STATS."""
+    func = getattr(cls, cls.FUNCTION)
+    if getattr(func, "_instrumented", False):
+        return cls
+
+    @functools.wraps(func)
+    def timed(self, *args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            STATS.count_call(cls.__name__, time.perf_counter() - t0)
+    timed._instrumented = True
+    setattr(cls, cls.FUNCTION, timed)
+    return cls
+
+
+try:
+    from aiohttp import web
+    from server import PromptServer
+except ImportError:
+    PromptServer = None
+
+if PromptServer is not None and getattr(PromptServer, "instance", None) is not None:
+    @PromptServer.instance.routes.get("/json_manager/stats")
+    async def json_loader_stats(request):
+        if request.query.get("reset") in ("1", "true"):
+            snapshot = STATS.snapshot()
+            STATS.reset()
+            return web.json_response(snapshot)
+        return web.json_response(STATS.snapshot())
+
 # --- Mappings ---
 NODE_CLASS_MAPPINGS = {
     "JSONLoaderLoRA": JSONLoaderLoRA,
@@ -278,9 +1741,14 @@ NODE_CLASS_MAPPINGS = {
     "JSONLoaderBatchLoRA": JSONLoaderBatchLoRA,
     "JSONLoaderBatchI2V": JSONLoaderBatchI2V,
     "JSONLoaderBatchVACE": JSONLoaderBatchVACE,
+    "JSONLoaderBatchLoRAList": JSONLoaderBatchLoRAList,
+    "JSONLoaderBatchI2VList": JSONLoaderBatchI2VList,
+    "JSONLoaderBatchVACEList": JSONLoaderBatchVACEList,
     "JSONLoaderCustom1": JSONLoaderCustom1,
     "JSONLoaderCustom3": JSONLoaderCustom3,
-    "JSONLoaderCustom6": JSONLoaderCustom6
+    "JSONLoaderCustom6": JSONLoaderCustom6,
+    "JSONLoaderCustomTyped": JSONLoaderCustomTyped,
+    "JSONBatchIterator": JSONBatchIterator
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
@@ -290,7 +1758,15 @@ NODE_DISPLAY_NAME_MAPPINGS = {
     "JSONLoaderBatchLoRA": "JSON Batch Loader (LoRAs)",
     "JSONLoaderBatchI2V": "JSON Batch Loader (I2V)",
     "JSONLoaderBatchVACE": "JSON Batch Loader (VACE)",
+    "JSONLoaderBatchLoRAList": "JSON Batch List Loader (LoRAs)",
+    "JSONLoaderBatchI2VList": "JSON Batch List Loader (I2V)",
+    "JSONLoaderBatchVACEList": "JSON Batch List Loader (VACE)",
     "JSONLoaderCustom1": "JSON Loader (Custom 1)",
     "JSONLoaderCustom3": "JSON Loader (Custom 3)",
-    "JSONLoaderCustom6": "JSON Loader (Custom 6)"
+    "JSONLoaderCustom6": "JSON Loader (Custom 6)",
+    "JSONLoaderCustomTyped": "JSON Loader (Custom Typed)",
+    "JSONBatchIterator": "JSON Batch Iterator"
 }
+
+for _cls in NODE_CLASS_MAPPINGS.values():
+    instrument(_cls)
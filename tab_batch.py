@@ -1,9 +1,14 @@
 import streamlit as st
 import random
-import copy
-from utils import DEFAULTS, save_json, load_json
+from utils import (
+    DEFAULTS, save_json, load_json, is_sharded, set_sharding, MANIFEST_KEY, DEFAULT_SHARD_SIZE,
+    is_jsonl, append_sequence, record_batch_op, load_history
+)
 from history_tree import HistoryTree 
 
+# Sequences rendered per page; long batches only build widgets for the visible page
+BATCH_PAGE_SIZE = 20
+
 def create_batch_callback(original_filename, current_data, current_dir):
     new_name = f"batch_{original_filename}"
     new_path = current_dir / new_name
@@ -53,9 +58,12 @@ def render_batch_processor(data, file_path, json_files, current_dir, selected_fi
         src_data, _ = load_json(current_dir / src_name)
 
     with ac2:
-        src_hist = src_data.get("prompt_history", [])
-        h_opts = [f"#{i+1}: {h.get('note', 'No Note')} ({h.get('prompt', '')[:15]}...)" for i, h in enumerate(src_hist)] if src_hist else []
-        sel_hist = st.selectbox("History Entry (Legacy):", h_opts, key="batch_src_hist")
+        # The history sidecar is only read once the legacy picker is switched on
+        src_hist, sel_hist = [], None
+        if st.checkbox("Copy from History (Legacy)", key="batch_src_use_hist"):
+            src_hist = load_history(src_data, current_dir / src_name).get("prompt_history", [])
+            h_opts = [f"#{i+1}: {h.get('note', 'No Note')} ({h.get('prompt', '')[:15]}...)" for i, h in enumerate(src_hist)] if src_hist else []
+            sel_hist = st.selectbox("History Entry (Legacy):", h_opts, key="batch_src_hist")
 
     bc1, bc2, bc3 = st.columns(3)
     
@@ -68,9 +76,8 @@ def render_batch_processor(data, file_path, json_files, current_dir, selected_fi
         for k in ["prompt_history", "history_tree", "note", "loras"]: 
             if k in new_item: del new_item[k]
         
-        batch_list.append(new_item)
         data["batch_data"] = batch_list
-        save_json(file_path, data)
+        append_sequence(file_path, data, new_item)
         st.session_state.ui_reset_token += 1
         st.rerun()
 
@@ -97,6 +104,35 @@ def render_batch_processor(data, file_path, json_files, current_dir, selected_fi
     st.markdown("---")
     st.info(f"Batch contains {len(batch_list)} sequences.")
 
+    # --- STORAGE (SHARDING) ---
+    with st.expander("🧩 Storage"):
+        if is_jsonl(file_path):
+            st.caption(f"JSON Lines file: one sequence per line, so adding a sequence appends a line. Other keys are kept in `{file_path.name}.meta.json`.")
+        else:
+            sharded = is_sharded(data)
+            if sharded:
+                st.caption(f"Sharded: {len(data[MANIFEST_KEY].get('shards', []))} shard files in `{file_path.name}.shards/`. Saving only rewrites the shards that changed.")
+            else:
+                st.caption("Split large batches into shard files so each edit rewrites one small file and ComfyUI only reads the shard it needs.")
+            sc1, sc2, sc3 = st.columns([1, 1, 1])
+            shard_size = sc1.number_input(
+                "Sequences per shard", min_value=1,
+                value=int(data.get(MANIFEST_KEY, {}).get("shard_size", DEFAULT_SHARD_SIZE)),
+                key=f"{selected_file_name}_shard_size"
+            )
+            with sc2:
+                st.write(""); st.write("")
+                if st.button("🧩 Apply Sharding" if sharded else "🧩 Split into Shards", use_container_width=True):
+                    set_sharding(file_path, data, shard_size)
+                    st.toast("Batch sharded!", icon="🧩")
+                    st.rerun()
+            with sc3:
+                st.write(""); st.write("")
+                if sharded and st.button("📄 Merge into One File", use_container_width=True):
+                    set_sharding(file_path, data, 0)
+                    st.toast("Merged back into a single file!", icon="📄")
+                    st.rerun()
+
     # Updated LoRA keys to match new logic
     lora_keys = ["lora 1 high", "lora 1 low", "lora 2 high", "lora 2 low", "lora 3 high", "lora 3 low"]
     standard_keys = {
@@ -109,7 +145,16 @@ def render_batch_processor(data, file_path, json_files, current_dir, selected_fi
         "reference path", "video file path", "reference image path", "flf image path"
     ])
 
-    for i, seq in enumerate(batch_list):
+    page_count = max(1, -(-len(batch_list) // BATCH_PAGE_SIZE))
+    page_key = f"{selected_file_name}_batch_page"
+    if st.session_state.get(page_key, 1) > page_count:
+        st.session_state[page_key] = page_count
+    page = 1
+    if page_count > 1:
+        page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, key=page_key)
+    page_start = (page - 1) * BATCH_PAGE_SIZE
+
+    for i, seq in enumerate(batch_list[page_start:page_start + BATCH_PAGE_SIZE], start=page_start):
         seq_num = seq.get("sequence_number", i+1)
         prefix = f"{selected_file_name}_seq{i}_v{st.session_state.ui_reset_token}" 
 
@@ -126,9 +171,7 @@ def render_batch_processor(data, file_path, json_files, current_dir, selected_fi
                     item["sequence_number"] = seq_num
                     for k in ["prompt_history", "history_tree"]: 
                         if k in item: del item[k]
-                    batch_list[i] = item
-                    data["batch_data"] = batch_list
-                    save_json(file_path, data)
+                    record_batch_op(file_path, data, {"op": "set", "index": i, "item": item})
                     st.session_state.ui_reset_token += 1 
                     st.toast("Copied!", icon="📥")
                     st.rerun()
@@ -141,9 +184,7 @@ def render_batch_processor(data, file_path, json_files, current_dir, selected_fi
                     max_sn = 0
                     for s in batch_list: max_sn = max(max_sn, int(s.get("sequence_number", 0)))
                     new_seq["sequence_number"] = max_sn + 1
-                    batch_list.insert(i + 1, new_seq)
-                    data["batch_data"] = batch_list
-                    save_json(file_path, data)
+                    record_batch_op(file_path, data, {"op": "insert", "index": i + 1, "item": new_seq})
                     st.session_state.ui_reset_token += 1
                     st.toast("Cloned to Next!", icon="👯")
                     st.rerun()
@@ -153,17 +194,17 @@ def render_batch_processor(data, file_path, json_files, current_dir, selected_fi
                     max_sn = 0
                     for s in batch_list: max_sn = max(max_sn, int(s.get("sequence_number", 0)))
                     new_seq["sequence_number"] = max_sn + 1
-                    batch_list.append(new_seq)
                     data["batch_data"] = batch_list
-                    save_json(file_path, data)
+                    append_sequence(file_path, data, new_seq)
                     st.session_state.ui_reset_token += 1
                     st.toast("Cloned to End!", icon="⏬")
                     st.rerun()
 
             # 3. Promote
             with act_c3:
-                if st.button("↖️ Promote", key=f"{prefix}_prom", help="Save as Single File", use_container_width=True):
+                if st.button("↖️ Promote", key=f"{prefix}_prom", help="Save as Single File", use_container_width=True, disabled=is_jsonl(file_path)):
                     single_data = seq.copy()
+                    load_history(data, file_path)
                     single_data["prompt_history"] = data.get("prompt_history", [])
                     single_data["history_tree"] = data.get("history_tree", {})
                     if "sequence_number" in single_data: del single_data["sequence_number"]
@@ -174,9 +215,7 @@ def render_batch_processor(data, file_path, json_files, current_dir, selected_fi
             # 4. Remove
             with act_c4:
                 if st.button("🗑️", key=f"{prefix}_del", use_container_width=True):
-                    batch_list.pop(i)
-                    data["batch_data"] = batch_list
-                    save_json(file_path, data)
+                    record_batch_op(file_path, data, {"op": "delete", "index": i})
                     st.rerun()
 
             st.markdown("---")
@@ -293,14 +332,14 @@ def render_batch_processor(data, file_path, json_files, current_dir, selected_fi
                 if st.button("Add", key=f"{prefix}_add_cust"):
                     if new_k and new_k not in seq:
                         seq[new_k] = new_v
-                        save_json(file_path, data)
+                        record_batch_op(file_path, data, {"op": "set", "index": i, "item": seq})
                         st.session_state.ui_reset_token += 1
                         st.rerun()
 
             if keys_to_remove:
                 for k in keys_to_remove:
                     del seq[k]
-                save_json(file_path, data)
+                record_batch_op(file_path, data, {"op": "set", "index": i, "item": seq})
                 st.session_state.ui_reset_token += 1
                 st.rerun()
 
@@ -316,11 +355,12 @@ def render_batch_processor(data, file_path, json_files, current_dir, selected_fi
         if st.button("💾 Save & Snap", use_container_width=True):
             data["batch_data"] = batch_list
             
+            load_history(data, file_path)
             tree_data = data.get("history_tree", {})
             htree = HistoryTree(tree_data)
             
-            snapshot_payload = copy.deepcopy(data)
-            if "history_tree" in snapshot_payload: del snapshot_payload["history_tree"]
+            # commit keeps its own copy of whatever changed, so no deepcopy here
+            snapshot_payload = {k: v for k, v in data.items() if k != "history_tree"}
             
             htree.commit(snapshot_payload, note=commit_msg if commit_msg else "Batch Update")
             
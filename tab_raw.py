@@ -1,7 +1,7 @@
 import streamlit as st
 import json
 import copy
-from utils import save_json, get_file_mtime
+from utils import save_json, file_version, load_history
 
 def render_raw_editor(data, file_path):
     st.subheader(f"💻 Raw Editor: {file_path.name}")
@@ -17,6 +17,8 @@ def render_raw_editor(data, file_path):
         )
 
     # Prepare display data
+    if not hide_history:
+        load_history(data, file_path)
     if hide_history:
         display_data = copy.deepcopy(data)
         # Safely remove heavy keys for the view only
@@ -65,7 +67,7 @@ def render_raw_editor(data, file_path):
             data.update(input_data)
             
             # 5. Update Metadata to prevent conflict warnings
-            st.session_state.last_mtime = get_file_mtime(file_path)
+            st.session_state.file_version = file_version(file_path)
             st.session_state.ui_reset_token += 1
             
             st.toast("Raw JSON Saved Successfully!", icon="✅")
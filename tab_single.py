@@ -1,6 +1,6 @@
 import streamlit as st
 import random
-from utils import DEFAULTS, save_json, get_file_mtime
+from utils import DEFAULTS, save_json, file_version, load_history
 
 def render_single_editor(data, file_path):
     is_batch_file = "batch_data" in data or isinstance(data, list)
@@ -9,6 +9,8 @@ def render_single_editor(data, file_path):
         st.info("This is a batch file. Switch to the 'Batch Processor' tab.")
         return
 
+    load_history(data, file_path)
+
     col1, col2 = st.columns([2, 1])
     
     # Unique prefix for this file's widgets + Version Token (Fixes Restore bug)
@@ -63,7 +65,7 @@ def render_single_editor(data, file_path):
         # Explicitly track standard setting keys to exclude them from custom list
         standard_keys = {
             "general_prompt", "general_negative", "current_prompt", "negative", "prompt", "seed",
-            "camera", "flf", "batch_data", "prompt_history", "sequence_number", "ui_reset_token",
+            "camera", "flf", "batch_data", "prompt_history", "history_tree", "sequence_number", "ui_reset_token",
             "model_name", "vae_name", "steps", "cfg", "denoise", "sampler_name", "scheduler"
         }
         standard_keys.update(lora_keys)
@@ -142,15 +144,15 @@ def render_single_editor(data, file_path):
         st.session_state.single_editor_cache = current_state
 
         st.subheader("Actions")
-        current_disk_mtime = get_file_mtime(file_path)
-        is_conflict = current_disk_mtime > st.session_state.last_mtime
+        # Size + content hash of the file on disk vs. what this session last loaded/saved
+        is_conflict = file_version(file_path) != st.session_state.file_version
         
         if is_conflict:
             st.error("⚠️ CONFLICT: Disk changed!")
             if st.button("Force Save"):
                 data.update(current_state)
                 save_json(file_path, data) # No return val in new utils
-                st.session_state.last_mtime = get_file_mtime(file_path) # Manual Update
+                st.session_state.file_version = file_version(file_path) # Manual Update
                 st.session_state.data_cache = data
                 st.toast("Saved!", icon="⚠️")
                 st.rerun()
@@ -161,7 +163,7 @@ def render_single_editor(data, file_path):
             if st.button("💾 Update File", use_container_width=True):
                 data.update(current_state)
                 save_json(file_path, data)
-                st.session_state.last_mtime = get_file_mtime(file_path)
+                st.session_state.file_version = file_version(file_path)
                 st.session_state.data_cache = data
                 st.toast("Updated!", icon="✅") 
 
@@ -173,7 +175,7 @@ def render_single_editor(data, file_path):
                 data["prompt_history"].insert(0, entry)
                 data.update(entry)
                 save_json(file_path, data)
-                st.session_state.last_mtime = get_file_mtime(file_path)
+                st.session_state.file_version = file_version(file_path)
                 st.session_state.data_cache = data
                 st.toast("Archived!", icon="📦")
                 st.rerun()
@@ -207,7 +209,7 @@ def render_single_editor(data, file_path):
                                 'prompt': edit_sp, 'negative': edit_sn
                             })
                             save_json(file_path, data)
-                            st.session_state.last_mtime = get_file_mtime(file_path)
+                            st.session_state.file_version = file_version(file_path)
                             st.session_state.data_cache = data
                             st.session_state.edit_history_idx = None
                             st.rerun()
@@ -229,7 +231,7 @@ def render_single_editor(data, file_path):
                             data.update(h)
                             if 'prompt' in h: data['current_prompt'] = h['prompt']
                             save_json(file_path, data)
-                            st.session_state.last_mtime = get_file_mtime(file_path)
+                            st.session_state.file_version = file_version(file_path)
                             st.session_state.data_cache = data
                             
                             # Refresh UI
@@ -245,6 +247,6 @@ def render_single_editor(data, file_path):
                         if bh3.button("🗑️", key=f"h_del_{idx}"):
                             history.pop(idx)
                             save_json(file_path, data)
-                            st.session_state.last_mtime = get_file_mtime(file_path)
+                            st.session_state.file_version = file_version(file_path)
                             st.session_state.data_cache = data
                             st.rerun()
@@ -3,9 +3,49 @@ import json
 import graphviz
 import time
 from history_tree import HistoryTree
-from utils import save_json
+from utils import save_json, load_history
+
+# Sequences listed per section of a diff, so huge batches stay quick to render
+DIFF_MAX_ROWS = 50
+
+def _short(value):
+    text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+    return (text[:60] + '..') if len(text) > 60 else text
+
+def _field_lines(changes):
+    lines = [f"➕ **{k}**: `{_short(v)}`" for k, v in changes["added"].items()]
+    lines += [f"➖ **{k}**: ~~`{_short(v)}`~~" for k, v in changes["removed"].items()]
+    lines += [f"✏️ **{k}**: `{_short(old)}` → `{_short(new)}`" for k, (old, new) in changes["changed"].items()]
+    return lines
+
+def render_diff(report):
+    """Renders a HistoryTree.diff report."""
+    fields, seqs = report["fields"], report["sequences"]
+    field_lines = _field_lines(fields)
+    if not field_lines and not any(seqs.values()):
+        st.info("No differences.")
+        return
+    st.caption(
+        f"{len(field_lines)} top-level field(s) • sequences: +{len(seqs['added'])} "
+        f"/ -{len(seqs['removed'])} / ~{len(seqs['changed'])}"
+    )
+    if field_lines:
+        st.markdown("  \n".join(field_lines))
+
+    for label, keys in (("Added", seqs["added"]), ("Removed", seqs["removed"])):
+        if keys:
+            shown = ", ".join(f"#{k}" for k in keys[:DIFF_MAX_ROWS])
+            more = f" … and {len(keys) - DIFF_MAX_ROWS} more" if len(keys) > DIFF_MAX_ROWS else ""
+            st.markdown(f"**{label} sequences:** {shown}{more}")
+
+    changed = list(seqs["changed"].items())
+    for key, changes in changed[:DIFF_MAX_ROWS]:
+        st.markdown(f"**🎬 Sequence #{key}**  \n" + "  \n".join(_field_lines(changes)))
+    if len(changed) > DIFF_MAX_ROWS:
+        st.caption(f"… and {len(changed) - DIFF_MAX_ROWS} more changed sequences")
 
 def render_timeline_tab(data, file_path):
+    load_history(data, file_path)
     tree_data = data.get("history_tree", {})
     if not tree_data:
         st.info("No history timeline exists. Make some changes in the Editor first!")
@@ -39,8 +79,7 @@ def render_timeline_tab(data, file_path):
     # --- RENDER LINEAR LOG VIEW ---
     elif view_mode == "📜 Linear Log":
         st.caption("A simple chronological list of all snapshots.")
-        all_nodes = list(htree.nodes.values())
-        all_nodes.sort(key=lambda x: x["timestamp"], reverse=True)
+        all_nodes = htree.nodes_by_time(reverse=True)
         
         for n in all_nodes:
             is_head = (n["id"] == htree.head_id)
@@ -59,12 +98,13 @@ def render_timeline_tab(data, file_path):
                 with c3:
                     if not is_head:
                         if st.button("⏪", key=f"log_rst_{n['id']}", help="Restore this version"):
+                            node_data = htree.get_data(n['id'])
                             # --- FIX: Cleanup 'batch_data' if restoring a Single File ---
-                            if "batch_data" not in n["data"] and "batch_data" in data:
+                            if "batch_data" not in node_data and "batch_data" in data:
                                 del data["batch_data"]
                             # -------------------------------------------------------------
                             
-                            data.update(n["data"])
+                            data.update(node_data)
                             htree.head_id = n['id']
                             data["history_tree"] = htree.to_dict()
                             save_json(file_path, data)
@@ -80,8 +120,7 @@ def render_timeline_tab(data, file_path):
     # --- ACTIONS & SELECTION ---
     col_sel, col_act = st.columns([3, 1])
     
-    all_nodes = list(htree.nodes.values())
-    all_nodes.sort(key=lambda x: x["timestamp"], reverse=True) 
+    all_nodes = htree.nodes_by_time(reverse=True)
     
     def fmt_node(n):
         return f"{n.get('note', 'Step')} ({n['id']})"
@@ -101,7 +140,7 @@ def render_timeline_tab(data, file_path):
         )
 
     if selected_node:
-        node_data = selected_node["data"]
+        node_data = htree.get_data(selected_node["id"])
         
         # --- ACTIONS ---
         with col_act:
@@ -131,22 +170,36 @@ def render_timeline_tab(data, file_path):
             save_json(file_path, data)
             st.rerun()
 
+        # --- COMPARE ---
+        with st.expander("🔍 Compare Versions"):
+            base_nodes = [n for n in all_nodes if n["id"] != selected_node["id"]]
+            if not base_nodes:
+                st.caption("There is no other version to compare with.")
+            else:
+                parent_idx = next((i for i, n in enumerate(base_nodes) if n["id"] == selected_node.get("parent")), 0)
+                base_node = st.selectbox(
+                    "Compare against:", base_nodes, format_func=fmt_node,
+                    index=parent_idx, key=f"diff_base_{selected_node['id']}"
+                )
+                st.caption(f"Changes from **{base_node.get('note', 'Step')}** to **{selected_node.get('note', 'Step')}**")
+                render_diff(htree.diff(base_node["id"], selected_node["id"]))
+
         # --- DANGER ZONE ---
         st.markdown("---")
         with st.expander("⚠️ Danger Zone (Delete)"):
             st.warning("Deleting a node cannot be undone.")
+            child_count = len(htree.children(selected_node['id']))
+            delete_subtree = False
+            if child_count:
+                delete_subtree = st.radio(
+                    f"This node has {child_count} child version(s):",
+                    [False, True],
+                    format_func=lambda v: "Delete its descendants too" if v else "Keep them (attach to the parent)",
+                    key=f"del_mode_{selected_node['id']}"
+                )
             if st.button("🗑️ Delete This Node", type="primary"):
                 if selected_node['id'] in htree.nodes:
-                    del htree.nodes[selected_node['id']]
-                    for b, tip in list(htree.branches.items()):
-                        if tip == selected_node['id']:
-                            del htree.branches[b] 
-                    if htree.head_id == selected_node['id']:
-                        if htree.nodes:
-                            fallback = sorted(htree.nodes.values(), key=lambda x: x["timestamp"])[-1]
-                            htree.head_id = fallback["id"]
-                        else:
-                            htree.head_id = None
+                    htree.delete_node(selected_node['id'], subtree=delete_subtree)
                     data["history_tree"] = htree.to_dict()
                     save_json(file_path, data)
                     st.toast("Node Deleted", icon="🗑️")
@@ -1,10 +1,11 @@
 import streamlit as st
 import json
 from history_tree import HistoryTree
-from utils import save_json
+from utils import save_json, load_history
 from streamlit_agraph import agraph, Node, Edge, Config
 
 def render_timeline_wip(data, file_path):
+    load_history(data, file_path)
     tree_data = data.get("history_tree", {})
     if not tree_data:
         st.info("No history timeline exists.")
@@ -16,9 +17,7 @@ def render_timeline_wip(data, file_path):
     nodes = []
     edges = []
     
-    sorted_nodes = sorted(htree.nodes.values(), key=lambda x: x["timestamp"])
-    
-    for n in sorted_nodes:
+    for n in htree.nodes_by_time():
         nid = n["id"]
         note = n.get('note', 'Step')
         short_note = (note[:15] + '..') if len(note) > 15 else note
@@ -30,7 +29,7 @@ def render_timeline_wip(data, file_path):
             color = "#fff6cd" 
             border = "#eebb00"
         
-        if nid in htree.branches.values():
+        if htree.branch_of(nid) is not None:
             if color == "#ffffff": 
                 color = "#e6ffe6"
                 border = "#44aa44"
@@ -88,7 +87,7 @@ def render_timeline_wip(data, file_path):
 
     if target_node_id and target_node_id in htree.nodes:
         selected_node = htree.nodes[target_node_id]
-        node_data = selected_node["data"]
+        node_data = htree.get_data(target_node_id)
 
         # Header
         c_h1, c_h2 = st.columns([3, 1])
@@ -1,7 +1,17 @@
+import atexit
+import copy
+import hashlib
 import json
+import os
+import threading
 import time
 from pathlib import Path
 import streamlit as st
+from json_io import (
+    atomic_write, append_line, locked, lock_path, dumps, loads, decompress, compress_for,
+    JOURNAL_SUFFIX, journal_path, read_journal, apply_batch_ops, sequence_key
+)
+from history_tree import HistoryTree, HISTORY_KEYS
 
 # Default structure for new files
 DEFAULTS = {
@@ -43,73 +53,485 @@ DEFAULTS = {
 CONFIG_FILE = Path(".editor_config.json")
 SNIPPETS_FILE = Path(".editor_snippets.json")
 
+class ConfigStore:
+    """
+    In-memory copy of a small JSON settings file. Reads are served from memory and the file is
+    re-parsed only when its mtime changes (e.g. another editor instance saved it). Writes mark
+    keys dirty and are flushed together WRITE_DELAY seconds after the last change, merged over
+    the file's current content so keys changed elsewhere are kept.
+    """
+    WRITE_DELAY = 0.5
+
+    def __init__(self, path, defaults=None):
+        self.path = Path(path)
+        self.defaults = defaults or (lambda: {})
+        self._data = None
+        self._mtime = None
+        self._dirty = set()
+        self._timer = None
+        self._lock = threading.RLock()
+
+    def _read_file(self):
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except OSError:
+            return None, {}
+        try:
+            with open(self.path, 'r') as f:
+                return mtime, json.load(f)
+        except (OSError, ValueError):
+            return mtime, {}
+
+    def _current(self):
+        """Parsed state, reloaded if the file changed on disk; pending changes win over disk."""
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        if self._data is None or mtime != self._mtime:
+            self._mtime, on_disk = self._read_file()
+            pending = {k: self._data[k] for k in self._dirty if self._data and k in self._data}
+            self._data = {**self.defaults(), **on_disk, **pending}
+        return self._data
+
+    def as_dict(self):
+        with self._lock:
+            return copy.deepcopy(self._current())
+
+    def get(self, key, default=None):
+        with self._lock:
+            return copy.deepcopy(self._current().get(key, default))
+
+    def update(self, values):
+        with self._lock:
+            data = self._current()
+            for k, v in values.items():
+                if k not in data or data[k] != v:
+                    data[k] = copy.deepcopy(v)
+                    self._dirty.add(k)
+            self._schedule()
+
+    def replace(self, values):
+        """Makes the stored mapping equal to values (keys not in values are removed)."""
+        with self._lock:
+            data = self._current()
+            for k in [k for k in data if k not in values]:
+                del data[k]
+                self._dirty.add(k)
+            self.update(values)
+
+    def _schedule(self):
+        if not self._dirty:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.WRITE_DELAY, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self):
+        """Writes pending changes now."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            _, merged = self._read_file()
+            for k in self._dirty:
+                if k in self._data:
+                    merged[k] = self._data[k]
+                else:
+                    merged.pop(k, None)
+            atomic_write(self.path, json.dumps(merged, indent=4))
+            self._dirty.clear()
+            self._data = {**self.defaults(), **merged}
+            self._mtime = self.path.stat().st_mtime_ns
+
+
+CONFIG = ConfigStore(CONFIG_FILE, lambda: {"favorites": [], "last_dir": str(Path.cwd()), "comfy_instances": []})
+SNIPPETS = ConfigStore(SNIPPETS_FILE)
+atexit.register(CONFIG.flush)
+atexit.register(SNIPPETS.flush)
+
 def load_config():
     """Loads the main editor configuration (Favorites, Last Dir, Servers)."""
-    if CONFIG_FILE.exists():
-        try:
-            with open(CONFIG_FILE, 'r') as f:
-                return json.load(f)
-        except:
-            pass
-    return {"favorites": [], "last_dir": str(Path.cwd()), "comfy_instances": []}
+    return CONFIG.as_dict()
 
 def save_config(current_dir, favorites, extra_data=None):
-    """Saves configuration to disk. Supports extra keys like 'comfy_instances'."""
-    data = {
-        "last_dir": str(current_dir),
-        "favorites": favorites
-    }
-    existing = load_config()
-    data.update(existing)
-    
+    """Saves configuration (written shortly after, see ConfigStore). Supports extra keys like 'comfy_instances'."""
+    data = dict(extra_data or {})
     data["last_dir"] = str(current_dir)
     data["favorites"] = favorites
-    
-    if extra_data:
-        data.update(extra_data)
-        
-    with open(CONFIG_FILE, 'w') as f:
-        json.dump(data, f, indent=4)
+    CONFIG.update(data)
 
 def load_snippets():
-    if SNIPPETS_FILE.exists():
+    return SNIPPETS.as_dict()
+
+def save_snippets(snippets):
+    SNIPPETS.replace(snippets)
+
+# --- Sharded Batches ---
+# A sharded batch file keeps only a manifest; sequences live in <name>.shards/NNNNN.json,
+# shard_size per file, so an edit rewrites one small shard (see json_loader for the reader).
+MANIFEST_KEY = "batch_manifest"
+DEFAULT_SHARD_SIZE = 50
+
+# path -> {shard name: sha1 of the bytes last read/written}, used to skip unchanged shards
+_SHARD_DIGESTS = {}
+
+def _digest(payload):
+    return hashlib.sha1(payload).hexdigest()
+
+def is_sharded(data):
+    return isinstance(data, dict) and isinstance(data.get(MANIFEST_KEY), dict)
+
+def _assemble_shards(path, data):
+    """Reads every shard listed in the manifest back into data['batch_data']."""
+    batch, digests = [], {}
+    for name in data[MANIFEST_KEY].get("shards", []):
+        with open(path.parent / name, 'rb') as f:
+            payload = f.read()
+        digests[name] = _digest(payload)
+        batch.extend(loads(payload).get("batch_data", []))
+    _SHARD_DIGESTS[str(path)] = digests
+    data["batch_data"] = batch
+    return data
+
+def _save_sharded(path, data, pretty=True):
+    """Writes only the shards whose content changed, then the manifest."""
+    path = Path(path)
+    manifest = dict(data[MANIFEST_KEY])
+    size = max(int(manifest.get("shard_size", DEFAULT_SHARD_SIZE)), 1)
+    batch = data.get("batch_data", [])
+    shard_dir = f"{path.name}.shards"
+    (path.parent / shard_dir).mkdir(exist_ok=True)
+
+    known = _SHARD_DIGESTS.get(str(path), {})
+    digests, names = {}, []
+    for start in range(0, len(batch), size):
+        name = f"{shard_dir}/{start // size:05d}.json"
+        payload = dumps({"batch_data": batch[start:start + size]}, pretty)
+        digests[name] = _digest(payload)
+        names.append(name)
+        if known.get(name) != digests[name] or not (path.parent / name).exists():
+            atomic_write(path.parent / name, payload)
+
+    for name in set(manifest.get("shards", [])) | set(known):
+        if name not in digests:
+            _remove_with_lock(path.parent / name)
+    _SHARD_DIGESTS[str(path)] = digests
+
+    manifest.update({
+        "shard_size": size,
+        "count": len(batch),
+        "shards": names,
+        "sequence_numbers": [sequence_key(s) for s in batch],
+    })
+    data[MANIFEST_KEY] = manifest
+    head = {k: v for k, v in data.items() if k != "batch_data" and k not in HISTORY_KEYS}
+    _write_if_changed(path, compress_for(path, dumps(head, pretty)))
+
+def _remove_with_lock(path):
+    Path(path).unlink(missing_ok=True)
+    Path(lock_path(path)).unlink(missing_ok=True)
+
+def set_sharding(path, data, shard_size):
+    """Converts a batch file to the sharded layout (shard_size > 0) or back to a single file (0)."""
+    path = Path(path)
+    if shard_size > 0:
+        data[MANIFEST_KEY] = {"shard_size": int(shard_size), "shards": data.get(MANIFEST_KEY, {}).get("shards", [])}
+    elif is_sharded(data):
+        for name in data[MANIFEST_KEY].get("shards", []):
+            _remove_with_lock(path.parent / name)
+        _SHARD_DIGESTS.pop(str(path), None)
+        del data[MANIFEST_KEY]
         try:
-            with open(SNIPPETS_FILE, 'r') as f:
-                return json.load(f)
-        except:
+            (path.parent / f"{path.name}.shards").rmdir()
+        except OSError:
             pass
-    return {}
+    save_json(path, data)
 
-def save_snippets(snippets):
-    with open(SNIPPETS_FILE, 'w') as f:
-        json.dump(snippets, f, indent=4)
+# --- JSON Lines Batches ---
+# A .jsonl batch keeps one sequence per line so adding a sequence appends a single line.
+# Other top-level keys live in a <name>.jsonl.meta.json sidecar (history in its own, see below).
+META_SUFFIX = ".meta.json"
+# Files next to the data files that are not editable documents themselves. The history
+# suffixes cover both <file>.history.json and the earlier <stem>.history.json names.
+SIDECAR_SUFFIXES = (
+    META_SUFFIX, ".cursor.json", JOURNAL_SUFFIX, ".history.json", ".history.json.gz", ".history.json.zst"
+)
+
+def is_jsonl(path):
+    return Path(path).suffix == ".jsonl"
+
+def jsonl_meta_path(path):
+    path = Path(path)
+    return path.with_name(path.name + META_SUFFIX)
+
+# Globs of the files the editor lists (compressed variants included)
+DATA_FILE_PATTERNS = ("*.json", "*.jsonl", "*.json.gz", "*.json.zst")
+
+def list_data_files(folder):
+    """Editable data files in a folder, skipping editor config and sidecar files."""
+    files = sorted(f for pattern in DATA_FILE_PATTERNS for f in folder.glob(pattern))
+    return [
+        f for f in files
+        if f.name not in (CONFIG_FILE.name, SNIPPETS_FILE.name) and not f.name.endswith(SIDECAR_SUFFIXES)
+    ]
+
+def _load_jsonl(path, raw):
+    batch = [loads(line) for line in raw.splitlines() if line.strip()]
+    data = {}
+    meta_path = jsonl_meta_path(path)
+    if meta_path.exists():
+        with open(meta_path, 'rb') as f:
+            data = loads(f.read())
+    data["batch_data"] = batch
+    return data
+
+def _save_jsonl(path, data, pretty=True):
+    _write_if_changed(path, b"".join(dumps(item, pretty=False) + b"\n" for item in data.get("batch_data", [])))
+    meta = {k: v for k, v in data.items() if k != "batch_data" and k not in HISTORY_KEYS}
+    meta_path = jsonl_meta_path(path)
+    if meta or meta_path.exists():
+        _write_if_changed(meta_path, dumps(meta, pretty))
+
+def append_sequence(path, data, item):
+    """
+    Adds a sequence to the end of a batch. .jsonl files get one appended line, plain .json
+    batches a journal op (see record_batch_op) instead of a full rewrite.
+    """
+    path = Path(path)
+    if is_jsonl(path) and path.exists():
+        data.setdefault("batch_data", []).append(item)
+        append_line(path, dumps(item, pretty=False))
+        return
+    record_batch_op(path, data, {"op": "append", "item": item})
+
+# --- Batch Edit Journal ---
+# Batch tab edits to a plain .json batch are appended to <name>.journal.jsonl as small ops
+# (json_io section 5) instead of rewriting the whole file. A background compactor folds them
+# into the file after JOURNAL_MAX_OPS ops or JOURNAL_MAX_AGE seconds, and every full save_json
+# drops the journal, since the data being saved already contains its ops.
+JOURNAL_MAX_OPS = 50
+JOURNAL_MAX_AGE = 30.0
+
+_COMPACT_TIMERS = {}  # path -> pending threading.Timer
+_COMPACT_LOCK = threading.Lock()
+
+def uses_journal(path, data):
+    """.jsonl and sharded batches already write incrementally, so only plain .json batches journal."""
+    return isinstance(data, dict) and not is_jsonl(path) and not is_sharded(data) and Path(path).exists()
+
+def record_batch_op(path, data, op):
+    """Applies op to data in memory and persists it as one journal line (or a full save where journaling does not apply)."""
+    apply_batch_ops(data, [op])
+    if not uses_journal(path, data):
+        save_json(path, data)
+        return
+    journal = journal_path(path)
+    with locked(path, exclusive=True):
+        append_line(journal, dumps(op, pretty=False), lock=False)
+        pending = len(read_journal(journal))
+    if pending >= JOURNAL_MAX_OPS:
+        threading.Thread(target=compact_journal, args=(path,), daemon=True).start()
+    else:
+        _schedule_compaction(path)
+
+def _schedule_compaction(path):
+    with _COMPACT_LOCK:
+        if str(path) in _COMPACT_TIMERS:
+            return
+        timer = threading.Timer(JOURNAL_MAX_AGE, compact_journal, args=(path,))
+        timer.daemon = True
+        _COMPACT_TIMERS[str(path)] = timer
+        timer.start()
+
+def compact_journal(path):
+    """Folds the pending journal ops into the file and removes the journal. Returns the op count."""
+    path = Path(path)
+    with _COMPACT_LOCK:
+        timer = _COMPACT_TIMERS.pop(str(path), None)
+    if timer is not None:
+        timer.cancel()
+    journal = journal_path(path)
+    try:
+        with locked(path, exclusive=True):
+            ops = read_journal(journal)
+            if ops:
+                with open(path, 'rb') as f:
+                    data = apply_batch_ops(loads(decompress(f.read())), ops)
+                _write_if_changed(path, compress_for(path, dumps(data, json_pretty())), lock=False)
+            Path(journal).unlink(missing_ok=True)
+    except Exception as e:
+        print(f"Error compacting {journal}: {e}")
+        return 0
+    return len(ops)
+
+def _compact_pending():
+    with _COMPACT_LOCK:
+        paths = list(_COMPACT_TIMERS)
+    for path in paths:
+        compact_journal(path)
+
+atexit.register(_compact_pending)
+
+# --- History Sidecar ---
+# history_tree / prompt_history live in <file>.history.json (see HistoryTree.sidecar_path), so
+# the data file, and every ComfyUI node parse of it, only carries the live settings.
+# load_json leaves them out; tabs that need them call load_history first.
+
+def load_history(data, path):
+    """Loads the history keys from the sidecar into data, unless they are already there."""
+    if isinstance(data, dict) and not any(k in data for k in HISTORY_KEYS):
+        data.update(HistoryTree.read_sidecar(path))
+        tree = data.get("history_tree")
+        if isinstance(tree, dict) and HistoryTree.needs_migration(tree):
+            # Older history with a full payload per node: move it to the blob store once
+            data["history_tree"] = HistoryTree(tree).to_dict()
+            _save_history(path, data, json_pretty())
+    return data
+
+def _save_history(path, data, pretty=True):
+    history = {k: data[k] for k in HISTORY_KEYS if k in data}
+    if len(history) < len(HISTORY_KEYS):
+        # only one key was touched: keep the other one from the sidecar
+        history = {**HistoryTree.read_sidecar(path), **history}
+    HistoryTree.write_sidecar(path, history, pretty)
+
+def _without_history(data):
+    if isinstance(data, dict) and any(k in data for k in HISTORY_KEYS):
+        return {k: v for k, v in data.items() if k not in HISTORY_KEYS}
+    return data
+
+# --- Content Versions ---
+# A file's version is (size, sha1) of its bytes on disk. load_json returns it with the data,
+# saves that would not change it are skipped, and the editor compares versions rather than
+# mtimes to notice edits made elsewhere. Hashes are cached against the file's (mtime_ns, size).
+
+# path -> ((mtime_ns, size), time hashed in ns, version)
+_VERSIONS = {}
+# A file modified this close to when it was hashed may have been rewritten again within the
+# same mtime tick (coarse filesystems), so its cached hash is not trusted
+MTIME_SLACK_NS = 2_000_000_000
+
+def _remember_version(path, info, payload):
+    version = (len(payload), _digest(payload))
+    _VERSIONS[str(path)] = ((info.st_mtime_ns, info.st_size), time.time_ns(), version)
+    return version
+
+def file_version(path):
+    """(size, sha1) of the file's bytes, or None if it doesn't exist. Re-reads only when the stat changed."""
+    path = Path(path)
+    try:
+        info = path.stat()
+    except OSError:
+        _VERSIONS.pop(str(path), None)
+        return None
+    cached = _VERSIONS.get(str(path))
+    if cached and cached[0] == (info.st_mtime_ns, info.st_size) and info.st_mtime_ns < cached[1] - MTIME_SLACK_NS:
+        return cached[2]
+    try:
+        with open(path, 'rb') as f:
+            return _remember_version(path, os.fstat(f.fileno()), f.read())
+    except OSError:
+        return None
+
+def _write_if_changed(path, payload, lock=True):
+    """atomic_write, unless the file already holds exactly these bytes. Returns True if it wrote."""
+    if file_version(path) == (len(payload), _digest(payload)):
+        return False
+    atomic_write(path, payload, lock)
+    _remember_version(path, Path(path).stat(), payload)
+    return True
 
 def load_json(path):
+    """Returns (data, version); version is None when the file does not exist."""
     path = Path(path)
     if not path.exists():
-        return DEFAULTS.copy(), 0
+        return DEFAULTS.copy(), None
     try:
-        with open(path, 'r') as f:
-            data = json.load(f)
-        return data, path.stat().st_mtime
+        with locked(path):
+            with open(path, 'rb') as f:
+                raw = f.read()
+                version = _remember_version(path, os.fstat(f.fileno()), raw)
+            if is_jsonl(path):
+                data = _load_jsonl(path, raw)
+            else:
+                data = loads(decompress(raw))
+                if is_sharded(data):
+                    data = _assemble_shards(path, data)
+                ops = read_journal(journal_path(path))
+                if ops:
+                    apply_batch_ops(data, ops)
+        if isinstance(data, dict) and any(k in data for k in HISTORY_KEYS):
+            # Older file with inline history: move it to the sidecar once. Best effort: on a
+            # read-only folder the history simply stays inline (and in memory) for now.
+            try:
+                save_json(path, data)
+            except OSError as e:
+                st.warning(f"Could not move the history of {path.name} to its sidecar: {e}")
+            else:
+                data = _without_history(data)
+                version = file_version(path)
+        return data, version
     except Exception as e:
         st.error(f"Error loading JSON: {e}")
-        return DEFAULTS.copy(), 0
+        return DEFAULTS.copy(), None
 
-def save_json(path, data):
-    with open(path, 'w') as f:
-        json.dump(data, f, indent=4)
+def json_pretty():
+    """Editor setting: indented files (default) or compact ones, which are smaller and faster to write."""
+    return CONFIG.get("json_output", "pretty") != "compact"
 
-def get_file_mtime(path):
-    """Returns the modification time of a file, or 0 if it doesn't exist."""
-    path = Path(path)
-    if path.exists():
-        return path.stat().st_mtime
-    return 0
+# Per-folder setting for files created from now on: "none", "gzip" or "zstd"
+COMPRESSION_SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+def folder_compression(folder):
+    return CONFIG.get("folder_compression", {}).get(str(folder), "none")
+
+def set_folder_compression(folder, method):
+    """Stores the folder's setting; returns the updated folder -> method mapping."""
+    settings = CONFIG.get("folder_compression", {})
+    if method == "none":
+        settings.pop(str(folder), None)
+    else:
+        settings[str(folder)] = method
+    CONFIG.update({"folder_compression": settings})
+    return settings
+
+def new_file_name(folder, name, jsonl=False):
+    """Adds the extension for a new file: .jsonl, or .json plus the folder's compression suffix."""
+    if jsonl:
+        return name if name.endswith(".jsonl") else name + ".jsonl"
+    if not name.endswith(".json"):
+        name += ".json"
+    return name + COMPRESSION_SUFFIXES.get(folder_compression(folder), "")
+
+def save_json(path, data):
+    """
+    Saves data; history keys (if loaded) go to the history sidecar, the rest to the file.
+    Files whose serialized bytes are unchanged are left untouched.
+    """
+    pretty = json_pretty()
+    if isinstance(data, dict) and any(k in data for k in HISTORY_KEYS):
+        _save_history(path, data, pretty)
+    if is_jsonl(path):
+        _save_jsonl(path, data, pretty)
+        return
+    if is_sharded(data):
+        _save_sharded(path, data, pretty)
+        Path(journal_path(path)).unlink(missing_ok=True)  # left over from before the split
+        return
+    payload = compress_for(path, dumps(_without_history(data), pretty))
+    # data already includes any journaled batch ops, so the journal goes with this write
+    with locked(path, exclusive=True):
+        _write_if_changed(path, payload, lock=False)
+        Path(journal_path(path)).unlink(missing_ok=True)
 
 def generate_templates(current_dir):
     """Creates dummy template files if folder is empty."""
-    save_json(current_dir / "template_i2v.json", DEFAULTS)
+    save_json(current_dir / new_file_name(current_dir, "template_i2v"), DEFAULTS)
     
     batch_data = {"batch_data": [DEFAULTS.copy(), DEFAULTS.copy()]}
-    save_json(current_dir / "template_batch.json", batch_data)
+    save_json(current_dir / new_file_name(current_dir, "template_batch"), batch_data)